@@ -0,0 +1,82 @@
+import argparse
+import asyncio
+import io
+import json
+import os
+import tempfile
+import tracemalloc
+from types import SimpleNamespace
+from oam_client.bulk import Importer, read_records
+
+
+class SimulatedBroker:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.created = 0
+
+    async def create(self) -> SimpleNamespace:
+        await asyncio.sleep(self.latency)
+        self.created += 1
+        return SimpleNamespace(id=str(self.created))
+
+    async def create_entity(self, asset):
+        return await self.create()
+
+    async def create_edge(self, relation, from_entity, to_entity):
+        return await self.create()
+
+    async def create_entity_tag(self, prop, entity):
+        return await self.create()
+
+    async def create_edge_tag(self, prop, edge):
+        return await self.create()
+
+
+def write_input(path: str, entities: int):
+    # One FQDN per line followed by a relation to the previous host and a
+    # source tag, the shape of a typical enumeration dump.
+    with open(path, "w") as f:
+        for i in range(entities):
+            f.write(json.dumps({"ref": f"h{i}", "type": "FQDN",
+                                "asset": {"name": f"host{i}.example.org"}}) + "\n")
+            if i:
+                f.write(json.dumps({"type": "SimpleRelation",
+                                    "relation": {"label": "node"},
+                                    "from_entity": f"h{i - 1}",
+                                    "to_entity": f"h{i}"}) + "\n")
+            f.write(json.dumps({"type": "SourceProperty",
+                                "property": {"name": "dns", "confidence": 100},
+                                "entity": f"h{i}"}) + "\n")
+
+
+async def run(path: str, latency: float, concurrency: int, batch_size: int):
+    importer = Importer(SimulatedBroker(latency), concurrency=concurrency,
+                        batch_size=batch_size, report=io.StringIO())
+    tracemalloc.start()
+    stats = await importer.run(read_records(path))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return stats, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entities", type=int, default=20_000)
+    parser.add_argument("--latency", type=float, default=0.002)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "input.ndjson")
+        write_input(path, args.entities)
+        print(f"{os.path.getsize(path) / 1e6:.1f} MB input, "
+              f"{args.latency * 1000:.1f} ms simulated broker latency")
+        print(f"{'concurrency':>11} {'records/s':>10} {'peak MiB':>9}")
+        for concurrency in (1, 8, 32, 128):
+            stats, peak = asyncio.run(
+                run(path, args.latency, concurrency, args.batch_size))
+            print(f"{concurrency:>11} {stats.rate:>10.0f} {peak / 2**20:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import time
+from asset_model import AssetType, FQDN
+from oam_client.messages import Entity, Event, ServerAction
+from oam_client.columnar import EventBatch
+
+EVENTS = 200_000
+
+
+def events(n: int) -> list[Event]:
+    return [
+        Event(ServerAction.EntityTouched, Entity(
+            AssetType.FQDN, FQDN(name=f"host{i}.example.org"), id=str(i),
+            created_at="2025-01-01T00:00:00Z",
+            last_seen=f"2025-01-02T00:{i // 60 % 60:02d}:{i % 60:02d}Z"))
+        for i in range(n)]
+
+
+def main():
+    sample = events(EVENTS)
+
+    for attributes in ((), ("name",)):
+        batch = EventBatch(attributes, capacity=EVENTS)
+        start = time.perf_counter()
+        batch.extend(sample)
+        append = time.perf_counter() - start
+
+        start = time.perf_counter()
+        columns = batch.to_numpy()
+        to_numpy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        record = batch.to_arrow()
+        to_arrow = time.perf_counter() - start
+
+        start = time.perf_counter()
+        recent = columns["last_seen"] > columns["last_seen"].mean()
+        filtered = int(recent.sum())
+        vectorized = time.perf_counter() - start
+
+        print(f"attributes={attributes!r}: "
+              f"append {EVENTS / append:,.0f} ev/s, "
+              f"to_numpy {to_numpy * 1000:.1f} ms, "
+              f"to_arrow {to_arrow * 1000:.1f} ms "
+              f"({record.nbytes / EVENTS:.0f} B/row), "
+              f"filter {vectorized * 1000:.2f} ms ({filtered} rows)")
+
+
+if __name__ == "__main__":
+    main()
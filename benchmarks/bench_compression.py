@@ -0,0 +1,101 @@
+import sys
+import time
+import zlib
+from asset_model import AssetType, FQDN, TLSCertificate
+from oam_client.messages import Entity, ServerAction
+from oam_client.compression import compress
+
+CHUNK = 16 * 1024
+ROUNDS = 20
+
+
+def certificate(i: int) -> Entity:
+    return Entity(
+        id=f"{i:08d}-0000-0000-0000-000000000000",
+        created_at="2025-01-01T00:00:00Z",
+        last_seen="2025-01-02T00:00:00Z",
+        type=AssetType.TLSCertificate,
+        asset=TLSCertificate(
+            version="3",
+            serial_number=f"{i:040x}",
+            subject_common_name=f"www{i}.example.org",
+            issuer_common_name="Example Issuing CA",
+            not_before="2025-01-01T00:00:00Z",
+            not_after="2026-01-01T00:00:00Z",
+            key_usage=[],
+            ext_key_usage=[],
+            signature_algorithm="SHA256-RSA",
+            public_key_algorithm="RSA",
+            is_ca=False,
+            crl_distribution_points=[f"http://crl{i % 7}.example.org/ca.crl"],
+            subject_key_id=f"{i * 31:040x}",
+            authority_key_id="00112233445566778899aabbccddeeff00112233"))
+
+
+def fqdn(i: int) -> Entity:
+    return Entity(
+        id=f"{i:08d}-0000-0000-0000-000000000000",
+        created_at="2025-01-01T00:00:00Z",
+        last_seen="2025-01-02T00:00:00Z",
+        type=AssetType.FQDN,
+        asset=FQDN(name=f"host{i}.example.org"))
+
+
+def stream(n: int) -> bytes:
+    return "".join(
+        f"event: {ServerAction.EntityCreated.value}\n"
+        f"data: {fqdn(i).to_json()}\n\n"
+        for i in range(n)).encode("utf-8")
+
+
+def decompressor(encoding: str):
+    # What httpx does for Content-Encoding on the response stream.
+    if encoding == "gzip":
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    import zstandard
+    return zstandard.ZstdDecompressor().decompressobj()
+
+
+def measure(name: str, data: bytes, encoding: str, level: int):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        blob = compress(data, encoding, level)
+    c_time = (time.perf_counter() - start) / ROUNDS
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        d = decompressor(encoding)
+        for i in range(0, len(blob), CHUNK):
+            d.decompress(blob[i:i + CHUNK])
+    d_time = (time.perf_counter() - start) / ROUNDS
+
+    mb = len(data) / 1e6
+    print(f"{name:<14} {encoding:<5} {level:>3} "
+          f"{len(data):>10} {len(blob):>10} {len(data) / len(blob):>7.2f} "
+          f"{mb / c_time:>9.1f} {mb / d_time:>9.1f}")
+
+
+def main():
+    payloads = {
+        "fqdn": fqdn(0).to_json().encode("utf-8"),
+        "certificate": certificate(0).to_json().encode("utf-8"),
+        "stream[10k]": stream(10_000),
+    }
+
+    codecs = [("gzip", 1), ("gzip", 6), ("gzip", 9)]
+    try:
+        import zstandard  # noqa: F401
+        codecs += [("zstd", 1), ("zstd", 3), ("zstd", 9)]
+    except ImportError:
+        print("zstandard not installed, skipping zstd", file=sys.stderr)
+
+    print(f"{'payload':<14} {'codec':<5} {'lvl':>3} "
+          f"{'raw':>10} {'wire':>10} {'ratio':>7} "
+          f"{'comp MB/s':>9} {'dec MB/s':>9}")
+    for name, data in payloads.items():
+        for encoding, level in codecs:
+            measure(name, data, encoding, level)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import json
+import time
+import typing
+from dataclasses import fields
+from enum import Enum
+from asset_model import (
+    OAMObject,
+    AssetType,
+    RelationType,
+    PropertyType,
+    get_asset_by_type,
+    get_relation_by_type,
+    get_property_by_type
+)
+from oam_client.decoders import object_decoder
+
+ROUNDS = 20_000
+
+
+def sample_value(hint):
+    origin = typing.get_origin(hint)
+    if origin is typing.Union:
+        return sample_value(typing.get_args(hint)[0])
+    if origin in (list, typing.List):
+        return []
+    if origin in (dict, typing.Dict):
+        return {}
+    if isinstance(hint, type):
+        if issubclass(hint, OAMObject):
+            return sample(hint)
+        if issubclass(hint, Enum):
+            return next(iter(hint)).value
+        if issubclass(hint, bool):
+            return True
+        if issubclass(hint, int):
+            return 1
+        if issubclass(hint, float):
+            return 1.0
+    return "x"
+
+
+def sample(cls) -> dict:
+    hints = typing.get_type_hints(cls)
+    return {
+        field.metadata.get("json", field.name): sample_value(hints[field.name])
+        for field in fields(cls)
+    }
+
+
+def measure(cls, data: dict) -> tuple[float, float]:
+    decode = object_decoder(cls)
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        OAMObject.from_dict(cls, data)
+    reflective = (time.perf_counter() - start) / ROUNDS
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        decode(data)
+    compiled = (time.perf_counter() - start) / ROUNDS
+
+    assert decode(data) == OAMObject.from_dict(cls, data)
+    return reflective, compiled
+
+
+def main():
+    classes = [get_asset_by_type(t) for t in AssetType] \
+        + [get_relation_by_type(t) for t in RelationType] \
+        + [get_property_by_type(t) for t in PropertyType]
+
+    print(f"{'type':<20} {'bytes':>6} {'reflective us':>14} "
+          f"{'compiled us':>12} {'speedup':>8}")
+    total_reflective = total_compiled = 0.0
+    for cls in classes:
+        data = sample(cls)
+        reflective, compiled = measure(cls, data)
+        total_reflective += reflective
+        total_compiled += compiled
+        print(f"{cls.__name__:<20} {len(json.dumps(data)):>6} "
+              f"{reflective * 1e6:>14.2f} {compiled * 1e6:>12.2f} "
+              f"{reflective / compiled:>7.1f}x")
+    print(f"{'all types':<20} {'':>6} {total_reflective * 1e6:>14.2f} "
+          f"{total_compiled * 1e6:>12.2f} "
+          f"{total_reflective / total_compiled:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
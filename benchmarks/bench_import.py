@@ -0,0 +1,51 @@
+import argparse
+import statistics
+import subprocess
+import sys
+
+HEAVY = ("httpx", "h2", "asset_model", "asyncio", "ssl")
+
+
+def importtime(statement: str) -> dict[str, int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, check=True)
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cum, name = line.split("|")
+        try:
+            cumulative[name.strip()] = int(cum)
+        except ValueError:
+            continue
+    return cumulative
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--statement", default="from oam_client import BrokerClient")
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--max-us", type=int, default=None,
+                        help="exit non-zero when the median exceeds this budget")
+    args = parser.parse_args()
+
+    runs = [importtime(args.statement) for _ in range(args.runs)]
+    totals = [run.get("oam_client", 0) for run in runs]
+    median = statistics.median(totals)
+
+    print(f"statement: {args.statement}")
+    print(f"oam_client cumulative import: median {median / 1000:.1f} ms, "
+          f"min {min(totals) / 1000:.1f} ms, max {max(totals) / 1000:.1f} ms")
+
+    loaded = [name for name in HEAVY if name in runs[-1]]
+    print(f"heavy modules loaded: {', '.join(loaded) or 'none'}")
+
+    if args.max_us is not None and median > args.max_us:
+        print(f"regression: {median:.0f} us > budget {args.max_us} us")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
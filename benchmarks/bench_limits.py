@@ -0,0 +1,82 @@
+import argparse
+import asyncio
+import time
+from oam_client.limits import AdaptiveConcurrency, AsyncLimiter
+
+
+class SimulatedBroker:
+    def __init__(self, workers: int, service_time: float, backlog: int):
+        self.slots = asyncio.Semaphore(workers)
+        self.service_time = service_time
+        self.backlog = backlog
+        self.waiting = 0
+
+    async def handle(self) -> int:
+        if self.waiting >= self.backlog:
+            await asyncio.sleep(self.service_time / 10)
+            return 503
+        self.waiting += 1
+        try:
+            async with self.slots:
+                await asyncio.sleep(self.service_time)
+                return 200
+        finally:
+            self.waiting -= 1
+
+
+async def run(limiter: AsyncLimiter, broker: SimulatedBroker,
+              requests: int, clients: int):
+    latencies = []
+    statuses = {200: 0, 503: 0}
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            async with limiter.request("/emit/entity") as sample:
+                sample.status = await broker.handle()
+            latencies.append(time.perf_counter() - start)
+            statuses[sample.status] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return (statuses[200] / elapsed, statuses[503],
+            latencies[len(latencies) // 2],
+            latencies[int(len(latencies) * 0.99)])
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--service-time", type=float, default=0.005)
+    parser.add_argument("--backlog", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--clients", type=int, default=512)
+    args = parser.parse_args()
+
+    print(f"broker: {args.workers} workers, "
+          f"{args.service_time * 1000:.1f} ms service, "
+          f"sustainable {args.workers / args.service_time:.0f} req/s")
+    print(f"{'limiter':<12} {'ok req/s':>9} {'503s':>6} "
+          f"{'p50 ms':>7} {'p99 ms':>7} {'limit':>6}")
+
+    configs = {
+        "none": None,
+        "fixed-8": AdaptiveConcurrency(initial=8, minimum=8, maximum=8),
+        "adaptive": AdaptiveConcurrency(),
+    }
+    for name, concurrency in configs.items():
+        broker = SimulatedBroker(args.workers, args.service_time, args.backlog)
+        throughput, rejected, p50, p99 = await run(
+            AsyncLimiter(concurrency=concurrency), broker,
+            args.requests, args.clients)
+        print(f"{name:<12} {throughput:>9.0f} {rejected:>6} "
+              f"{p50 * 1000:>7.1f} {p99 * 1000:>7.1f} "
+              f"{'-' if concurrency is None else concurrency.limit:>6}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
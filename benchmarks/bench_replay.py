@@ -0,0 +1,83 @@
+import argparse
+import asyncio
+import time
+from asset_model import AssetType, FQDN
+from oam_client import BrokerClient, AsyncBrokerClient
+from oam_client.messages import Entity, ServerAction
+from oam_client.replay import RecordedEvent, ReplayTransport, read_recording
+
+
+def synthetic(n: int, rate: float) -> list[RecordedEvent]:
+    return [
+        RecordedEvent(
+            int(i / rate * 1e9), ServerAction.EntityTouched.value, str(i),
+            Entity(AssetType.FQDN, FQDN(name=f"host{i}.example.org"),
+                   id=str(i), created_at="2025-01-01T00:00:00Z",
+                   last_seen="2025-01-02T00:00:00Z").to_json().encode("utf-8"))
+        for i in range(n)]
+
+
+def percentile(values: list[float], q: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def report(name: str, transport: ReplayTransport, elapsed: float):
+    latencies = sorted(transport.latencies())
+    print(f"{name:<22} {len(latencies) / elapsed:>10.0f} "
+          f"{percentile(latencies, 0.5) * 1e3:>8.2f} "
+          f"{percentile(latencies, 0.99) * 1e3:>8.2f} "
+          f"{percentile(latencies, 0.999) * 1e3:>8.2f} "
+          f"{latencies[-1] * 1e3:>8.2f}")
+
+
+def run_sync(events, speed, work: float):
+    transport = ReplayTransport(events, speed)
+    client = BrokerClient("http://replay", transport=transport)
+
+    def handler(event):
+        if work:
+            time.sleep(work)
+
+    start = time.perf_counter()
+    client.listen_events(transport.measure(handler))
+    return transport, time.perf_counter() - start
+
+
+async def run_async(events, speed, work: float):
+    transport = ReplayTransport(events, speed)
+    client = AsyncBrokerClient("http://replay", transport=transport)
+
+    async def handler(event):
+        if work:
+            await asyncio.sleep(work)
+
+    start = time.perf_counter()
+    await client.listen_events(transport.measure(handler))
+    return transport, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", default=None,
+                        help="recording made with `python -m oam_client record`")
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--rate", type=float, default=20_000,
+                        help="events per second of the synthetic stream")
+    parser.add_argument("--work-ms", type=float, default=0.0,
+                        help="simulated handler time")
+    args = parser.parse_args()
+
+    events = list(read_recording(args.file)) if args.file \
+        else synthetic(args.events, args.rate)
+    span = events[-1].offset_ns / 1e9
+    print(f"{len(events)} events over {span:.2f} s recorded")
+    print(f"{'consumer':<22} {'events/s':>10} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'p99.9 ms':>8} {'max ms':>8}")
+    work = args.work_ms / 1000
+    for speed, label in ((1.0, "1x"), (4.0, "4x"), (None, "max")):
+        report(f"sync {label}", *run_sync(events, speed, work))
+        report(f"async {label}", *asyncio.run(run_async(events, speed, work)))
+
+
+if __name__ == "__main__":
+    main()
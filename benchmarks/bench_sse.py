@@ -0,0 +1,96 @@
+import codecs
+import gc
+import sys
+import time
+import tracemalloc
+from asset_model import AssetType, FQDN
+from oam_client.messages import Entity, Event, ServerAction
+from oam_client.sse import SSEParser
+
+EVENTS = 20_000
+CHUNK = 16 * 1024
+
+
+def stream(n: int) -> list[bytes]:
+    data = "".join(
+        f"event: {ServerAction.EntityTouched.value}\n"
+        f"id: {i}\n"
+        f"data: {Entity(AssetType.FQDN, FQDN(name=f'host{i}.example.org'), id=str(i), created_at='2025-01-01T00:00:00Z', last_seen='2025-01-02T00:00:00Z').to_json()}\n\n"
+        for i in range(n)).encode("utf-8")
+    return [data[i:i + CHUNK] for i in range(0, len(data), CHUNK)]
+
+
+def parse_bytes(chunks):
+    parser = SSEParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+
+
+def parse_text(chunks):
+    from httpx_sse._decoders import SSEDecoder, SSELineDecoder
+
+    text = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    lines = SSELineDecoder()
+    decoder = SSEDecoder()
+    for chunk in chunks:
+        for line in lines.decode(text.decode(chunk)):
+            sse = decoder.decode(line)
+            if sse is not None:
+                yield sse
+
+
+def rate(parse, chunks, decode: bool, rounds: int = 7) -> float:
+    best = float("inf")
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            n = 0
+            for sse in parse(chunks):
+                if decode:
+                    Event.from_sse(sse)
+                n += 1
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return n / best
+
+
+def memory(parse, chunks) -> tuple[float, float]:
+    gc.collect()
+    tracemalloc.start()
+    for _ in parse(chunks):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    gc.collect()
+    before = sys.getallocatedblocks()
+    kept = list(parse(chunks))
+    blocks = (sys.getallocatedblocks() - before) / len(kept)
+    return peak / 1024, blocks
+
+
+def main():
+    chunks = stream(EVENTS)
+    parsers = {"bytes (oam_client.sse)": parse_bytes}
+    try:
+        from httpx_sse._decoders import SSEDecoder  # noqa: F401
+        parsers["text (httpx_sse)"] = parse_text
+    except ImportError:
+        print("httpx_sse not installed, skipping the text path", file=sys.stderr)
+
+    print(f"{EVENTS} events, {sum(map(len, chunks)) / 1e6:.1f} MB "
+          f"in {CHUNK // 1024} KiB chunks")
+    print(f"{'parser':<24} {'parse ev/s':>11} {'+decode ev/s':>13} "
+          f"{'peak KiB':>9} {'blocks/ev':>10}")
+    for name, parse in parsers.items():
+        parse_rate = rate(parse, chunks, False)
+        decode_rate = rate(parse, chunks, True)
+        peak, blocks = memory(parse, chunks)
+        print(f"{name:<24} {parse_rate:>11.0f} {decode_rate:>13.0f} "
+              f"{peak:>9.0f} {blocks:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import argparse
+import asyncio
+import logging
+import sys
+from .async_client import AsyncBrokerClient
+from .client import BrokerClient
+from .bulk import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CONCURRENCY,
+    Checkpoint,
+    Importer,
+    read_records,
+)
+from .limits import AdaptiveConcurrency
+
+
+def import_command(args: argparse.Namespace) -> int:
+    client = AsyncBrokerClient(
+        args.url,
+        verify=not args.insecure,
+        compression=args.compression,
+        rate_limit=args.rate_limit,
+        concurrency=AdaptiveConcurrency(maximum=args.concurrency)
+        if args.adaptive else None)
+
+    checkpoint = Checkpoint(args.checkpoint or args.file + ".checkpoint")
+    if args.resume:
+        checkpoint.load()
+        if checkpoint.offset:
+            print(f"resuming at byte {checkpoint.offset} with "
+                  f"{len(checkpoint.refs)} known references, retrying "
+                  f"{len(checkpoint.failed)} failed records", file=sys.stderr)
+    else:
+        checkpoint.clear()
+
+    importer = Importer(
+        client,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        checkpoint=checkpoint,
+        report_interval=args.report_interval)
+    records = read_records(
+        args.file, args.format, checkpoint.offset, checkpoint.failed)
+    try:
+        stats = asyncio.run(importer.run(records))
+    except KeyboardInterrupt:
+        print(f"interrupted, resume with --resume from byte "
+              f"{checkpoint.offset}", file=sys.stderr)
+        return 130
+    finally:
+        checkpoint.close()
+    return 1 if stats.failed else 0
+
+
+def record_command(args: argparse.Namespace) -> int:
+    from .replay import record
+
+    client = BrokerClient(
+        args.url, verify=not args.insecure, compression=args.compression)
+    try:
+        count = record(client, args.file, args.limit, args.duration)
+    except KeyboardInterrupt:
+        print("interrupted, the recording is usable up to the last event",
+              file=sys.stderr)
+        return 130
+    print(f"recorded {count} events", file=sys.stderr)
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m oam_client")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    bulk = commands.add_parser(
+        "import", help="bulk import assets, relations and tags")
+    bulk.add_argument("url", help="broker URL")
+    bulk.add_argument("file", help="NDJSON or CSV file to import")
+    bulk.add_argument("--format", choices=("ndjson", "csv"), default=None,
+                      help="input format, detected from the extension by default")
+    bulk.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                      help="maximum number of requests in flight")
+    bulk.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                      help="records emitted between checkpoints")
+    bulk.add_argument("--adaptive", action="store_true",
+                      help="adapt concurrency to broker latency and overload")
+    bulk.add_argument("--rate-limit", type=float, default=None,
+                      help="maximum requests per second per endpoint")
+    bulk.add_argument("--compression", choices=("gzip", "zstd"), default=None)
+    bulk.add_argument("--checkpoint", default=None,
+                      help="checkpoint file, FILE.checkpoint by default")
+    bulk.add_argument("--resume", action="store_true",
+                      help="retry failed records and continue after the "
+                      "last checkpointed batch")
+    bulk.add_argument("--report-interval", type=float, default=5.0,
+                      help="seconds between throughput reports")
+    bulk.add_argument("--insecure", action="store_true",
+                      help="do not verify the broker certificate")
+    bulk.set_defaults(func=import_command)
+
+    recorder = commands.add_parser(
+        "record", help="record the event stream for offline replay")
+    recorder.add_argument("url", help="broker URL")
+    recorder.add_argument("file", help="recording to write")
+    recorder.add_argument("--limit", type=int, default=None,
+                          help="stop after this many events")
+    recorder.add_argument("--duration", type=float, default=None,
+                          help="stop after this many seconds")
+    recorder.add_argument("--compression", choices=("gzip", "zstd"),
+                          default=None)
+    recorder.add_argument("--insecure", action="store_true",
+                          help="do not verify the broker certificate")
+    recorder.set_defaults(func=record_command)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
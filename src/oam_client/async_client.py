@@ -1,18 +1,26 @@
-import httpx
-import asyncio
-from typing import Callable, Awaitable
-from httpx_sse import aconnect_sse
-from asset_model import Asset, Relation, Property
+from __future__ import annotations
+from contextlib import nullcontext
+from enum import Enum
+from typing import Callable, Awaitable, Iterable, Optional, TYPE_CHECKING
 from .messages import (
+    ServerAction,
     Event,
     Entity,
     Edge,
     EdgeTag,
     EntityTag,
 )
-from .base import BrokerClientBase
+from .base import BrokerClientBase, DEFAULT_QUEUE_SIZE
+from .sse import SSEParser
+from .touches import TouchCollapser
+from .limits import RateLimiter, AdaptiveConcurrency, Sample, AsyncLimiter
 from logging import getLogger
 
+if TYPE_CHECKING:
+    from asset_model import Asset, Relation, Property
+    from .coalescing import AsyncWriteCoalescer
+    from .hub import AsyncSubscription
+
 AsyncHandlerFunction = Callable[[Event], Awaitable[None]]
 
 logger = getLogger(__name__)
@@ -25,44 +33,125 @@ class AsyncBrokerClient(BrokerClientBase):
             path: str,
             payload: str
     ) -> str:
-        async with httpx.AsyncClient(
+        import httpx
+
+        limit = nullcontext(Sample()) if self.limiter is None \
+            else self.limiter.request(path)
+
+        async with limit as sample, httpx.AsyncClient(
                 http2=True,
-                verify=self.ssl_context
+                verify=self.ssl_context,
+                transport=self.transport
         ) as client:
+            content, headers = self._encode_payload(payload)
             response = await client.request(
                 method=method.upper(),
                 url=self.url + path,
-                headers={
-                    "Content-Type": "application/json; charset=utf-8"
-                },
-                content=payload.encode("utf-8"),
+                headers=headers,
+                content=content,
             )
+            if "Content-Encoding" in headers \
+               and self._compression_refused(response.status_code):
+                content, headers = self._encode_payload(payload)
+                response = await client.request(
+                    method=method.upper(),
+                    url=self.url + path,
+                    headers=headers,
+                    content=content,
+                )
+            sample.status = response.status_code
             logger.debug(f"__send:response:{response.text}")
             return response.text
 
+    async def __write(
+            self,
+            method: str,
+            path: str,
+            payload: str
+    ) -> str:
+        if self.coalescer is None:
+            return await self.__send(method, path, payload)
+        return await self.coalescer.submit(method, path, payload)
+
+    def _coalescer(self, window: float) -> AsyncWriteCoalescer:
+        from .coalescing import AsyncWriteCoalescer
+
+        return AsyncWriteCoalescer(window, self.__send)
+
+    def _limiter(
+            self,
+            rate: Optional[RateLimiter],
+            concurrency: Optional[AdaptiveConcurrency]
+    ) -> AsyncLimiter:
+        return AsyncLimiter(rate, concurrency)
+
     async def __listen(
             self,
             method: str,
             path: str,
-            handler: AsyncHandlerFunction
+            handler: AsyncHandlerFunction,
+            touch_window: Optional[float] = None
     ):
+        import asyncio
+        import httpx
+
         tasks = []
+        collapser = None if touch_window is None \
+            else TouchCollapser(touch_window)
+
+        async def expire():
+            while True:
+                await asyncio.sleep(collapser.remaining())
+                for event in collapser.expire():
+                    tasks.append(asyncio.create_task(handler(event)))
+
+        expiry = None if collapser is None else asyncio.create_task(expire())
+
+        def stop() -> list[Exception]:
+            # Ends the timer and releases everything still held, returning
+            # the timer's error and those of payloads that failed to decode.
+            if expiry is None:
+                return []
+            errors = []
+            if expiry.done():
+                errors.append(expiry.exception())
+            expiry.cancel()
+            events, failed = collapser.drain()
+            for event in events:
+                tasks.append(asyncio.create_task(handler(event)))
+            return errors + failed
+
         while True:
             try:
                 async with httpx.AsyncClient(
                         http2=True,
                         verify=self.ssl_context,
-                        timeout=httpx.Timeout(None, connect=10.0)
+                        timeout=httpx.Timeout(None, connect=10.0),
+                        transport=self.transport
                 ) as client:
-                    async with aconnect_sse(
-                            client=client,
+                    async with client.stream(
                             method=method.upper(),
-                            url=self.url + path
-                    ) as event_source:
-                        async for sse in event_source.aiter_sse():
-                            tasks.append(
-                                asyncio.create_task(
-                                    handler(Event.from_sse(sse))))
+                            url=self.url + path,
+                            headers=self._listen_headers()
+                    ) as response:
+                        if response.status_code == 204:
+                            # No Content tells the client to stop reconnecting.
+                            break
+                        response.raise_for_status()
+                        parser = SSEParser()
+                        async for chunk in response.aiter_bytes():
+                            for sse in parser.feed(chunk):
+                                if collapser is None:
+                                    tasks.append(
+                                        asyncio.create_task(
+                                            handler(Event.from_sse(sse))))
+                                    continue
+                                for event in collapser.push(
+                                        sse.event, sse.data):
+                                    tasks.append(
+                                        asyncio.create_task(handler(event)))
+                            if expiry is not None and expiry.done():
+                                raise expiry.exception()
 
             except (httpx.ReadTimeout,
                     httpx.ConnectError,
@@ -71,16 +160,40 @@ class AsyncBrokerClient(BrokerClientBase):
             except asyncio.CancelledError:
                 break
             except Exception as e:
+                stop()
                 await asyncio.gather(*tasks)
                 raise e
 
+        errors = stop()
         await asyncio.gather(*tasks)
+        if errors:
+            raise errors[0]
 
     async def listen_events(
             self,
-            handler: AsyncHandlerFunction
+            handler: AsyncHandlerFunction,
+            touch_window: Optional[float] = None
     ):
-        await self.__listen("GET", "/listen", handler)
+        await self.__listen("GET", "/listen", handler, touch_window)
+
+    def subscribe(
+            self,
+            actions: Optional[Iterable[ServerAction | str]] = None,
+            types: Optional[Iterable[Enum | str]] = None,
+            maxsize: int = DEFAULT_QUEUE_SIZE
+    ) -> AsyncSubscription:
+        from .hub import AsyncSubscriptionHub
+
+        if self.hub is None:
+            self.hub = AsyncSubscriptionHub(self)
+        return self.hub.subscribe(actions, types, maxsize)
+
+    def unsubscribe(
+            self,
+            subscription: AsyncSubscription
+    ):
+        if self.hub is not None:
+            self.hub.unsubscribe(subscription)
 
     async def create_entity(
             self,
@@ -97,14 +210,14 @@ class AsyncBrokerClient(BrokerClientBase):
     ) -> Entity:
         entity = Entity(asset.asset_type, asset)
         return Entity.from_json(
-            await self.__send("put", f"/emit/entity/{id}", entity.to_json()))
+            await self.__write("put", f"/emit/entity/{id}", entity.to_json()))
 
     async def delete_entity(
             self,
             id: str
     ) -> Entity:
         return Entity.from_json(
-            await self.__send("delete", f"/emit/entity/{id}", ""))
+            await self.__write("delete", f"/emit/entity/{id}", ""))
 
     async def create_edge(
             self,
@@ -129,14 +242,14 @@ class AsyncBrokerClient(BrokerClientBase):
             relation.relation_type, relation,
             from_entity, to_entity)
         return Edge.from_json(
-            await self.__send("put", f"/emit/edge/{id}", edge.to_json()))
+            await self.__write("put", f"/emit/edge/{id}", edge.to_json()))
 
     async def delete_edge(
             self,
             id: str
     ) -> Edge:
         return Edge.from_json(
-            await self.__send("delete", f"/emit/edge/{id}", ""))
+            await self.__write("delete", f"/emit/edge/{id}", ""))
 
     async def create_entity_tag(
             self,
@@ -158,7 +271,7 @@ class AsyncBrokerClient(BrokerClientBase):
         entity_tag = EntityTag(
             property.property_type, property, entity)
         return EntityTag.from_json(
-            await self.__send(
+            await self.__write(
                 "put", f"/emit/entity_tag/{id}", entity_tag.to_json()))
 
     async def delete_entity_tag(
@@ -166,7 +279,7 @@ class AsyncBrokerClient(BrokerClientBase):
             id: str
     ) -> EntityTag:
         return EntityTag.from_json(
-            await self.__send("delete", f"/emit/entity_tag/{id}", ""))
+            await self.__write("delete", f"/emit/entity_tag/{id}", ""))
 
     async def create_edge_tag(
             self,
@@ -187,7 +300,7 @@ class AsyncBrokerClient(BrokerClientBase):
         edge_tag = EdgeTag(
             property.property_type, property, edge)
         return EdgeTag.from_json(
-            await self.__send(
+            await self.__write(
                 "put", f"/emit/edge_tag/{id}", edge_tag.to_json()))
 
     async def delete_edge_tag(
@@ -195,4 +308,4 @@ class AsyncBrokerClient(BrokerClientBase):
             id: str
     ) -> EdgeTag:
         return EdgeTag.from_json(
-            await self.__send("delete", f"/emit/entity_tag/{id}", ""))
+            await self.__write("delete", f"/emit/entity_tag/{id}", ""))
@@ -1,18 +1,45 @@
-import ssl
-from typing import Optional
-from abc import ABC
+from __future__ import annotations
+from typing import Optional, TYPE_CHECKING
+from abc import ABC, abstractmethod
+from .compression import (
+    DEFAULT_THRESHOLD,
+    check_encoding,
+    compress,
+    accept_encoding,
+)
+from .limits import RateLimiter, AdaptiveConcurrency
+
+if TYPE_CHECKING:
+    import ssl
+
+DEFAULT_QUEUE_SIZE = 1024
 
 
 class BrokerClientBase(ABC):
     url: str
     ssl_context: ssl.SSLContext
+    compression: Optional[str]
+    compression_threshold: int
+    hub: Optional[object]
+    coalescer: Optional[object]
+    limiter: Optional[object]
+    transport: Optional[object]
 
     def __init__(
             self,
             url: str,
             keylog_filename: Optional[str] = None,
-            verify: bool = True
+            verify: bool = True,
+            compression: Optional[str] = None,
+            compression_threshold: int = DEFAULT_THRESHOLD,
+            coalesce_window: Optional[float] = None,
+            rate_limit: Optional[float] = None,
+            rate_burst: Optional[float] = None,
+            concurrency: Optional[AdaptiveConcurrency] = None,
+            transport: Optional[object] = None
     ):
+        import ssl
+
         self.url = url
 
         self.ssl_context = ssl.create_default_context()
@@ -20,3 +47,56 @@ class BrokerClientBase(ABC):
         if not verify:
             self.ssl_context.check_hostname = False
             self.ssl_context.verify_mode = ssl.CERT_NONE
+
+        self.compression = check_encoding(compression)
+        self.compression_threshold = compression_threshold
+        self.hub = None
+        self.transport = transport
+        self.coalescer = None \
+            if coalesce_window is None else self._coalescer(coalesce_window)
+        self.limiter = None \
+            if rate_limit is None and concurrency is None \
+            else self._limiter(
+                None if rate_limit is None
+                else RateLimiter(rate_limit, rate_burst),
+                concurrency)
+
+    @abstractmethod
+    def _coalescer(self, window: float):
+        ...
+
+    @abstractmethod
+    def _limiter(
+            self,
+            rate: Optional[RateLimiter],
+            concurrency: Optional[AdaptiveConcurrency]
+    ):
+        ...
+
+    def _encode_payload(self, payload: str) -> tuple[bytes, dict[str, str]]:
+        headers = {
+            "Content-Type": "application/json; charset=utf-8"
+        }
+        content = payload.encode("utf-8")
+        if self.compression is not None \
+           and len(content) >= self.compression_threshold:
+            content = compress(content, self.compression)
+            headers["Content-Encoding"] = self.compression
+        return content, headers
+
+    def _listen_headers(self) -> dict[str, str]:
+        headers = {
+            "Accept": "text/event-stream",
+            "Cache-Control": "no-store",
+        }
+        if self.compression is not None:
+            headers["Accept-Encoding"] = accept_encoding(self.compression)
+        return headers
+
+    def _compression_refused(self, status_code: int) -> bool:
+        # The broker answers 415 when it cannot decode the body encoding:
+        # stop compressing for this client and let the caller resend.
+        if status_code == 415 and self.compression is not None:
+            self.compression = None
+            return True
+        return False
@@ -0,0 +1,443 @@
+import asyncio
+import csv
+import json
+import mmap
+import os
+import sys
+import time
+import types
+import typing
+from dataclasses import dataclass, field, fields
+from enum import Enum
+from functools import cache
+from logging import getLogger
+from typing import Any, Callable, Iterable, Iterator, Optional, TextIO
+from asset_model import (
+    OAMObject,
+    get_asset_by_type,
+    get_relation_by_type,
+    get_property_by_type,
+)
+from .async_client import AsyncBrokerClient
+from .decoders import asset_decoder, relation_decoder, property_decoder
+
+DEFAULT_CONCURRENCY = 32
+DEFAULT_BATCH_SIZE = 1000
+
+RESERVED_COLUMNS = (
+    "ref", "id", "type", "from_entity", "to_entity", "entity", "edge")
+
+# The kind of record each reference field must point at. Entities depend
+# on nothing and each kind only depends on an earlier one, so references
+# can never form a cycle.
+REFERENCES = {
+    "edge": (("from_entity", "entity"), ("to_entity", "entity")),
+    "entity_tag": (("entity", "entity"),),
+    "edge_tag": (("edge", "edge"),),
+}
+
+logger = getLogger(__name__)
+
+
+@dataclass
+class Record:
+    offset: int
+    end: int
+    data: dict
+    error: Optional[Exception] = None
+
+
+@dataclass
+class ImportStats:
+    records: int = 0
+    created: int = 0
+    failed: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.records / elapsed if elapsed > 0 else 0.0
+
+
+def record_kind(data: dict) -> str:
+    if "asset" in data:
+        return "entity"
+    if "relation" in data:
+        return "edge"
+    return "entity_tag" if "entity" in data else "edge_tag"
+
+
+def record_ref(data: dict) -> Optional[str]:
+    return data.get("ref") or data.get("id")
+
+
+def iter_lines(
+        path: str,
+        offset: int = 0,
+        retry: Iterable[int] = ()
+) -> Iterator[tuple[int, int, bytes]]:
+    # Lines starting at the retry offsets come first, then every line
+    # from offset on.
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            size = len(m)
+
+            def line_at(start: int) -> tuple[int, bytes]:
+                end = m.find(b"\n", start)
+                if end == -1:
+                    end = size
+                return end + 1, m[start:end].strip()
+
+            for start in sorted(retry):
+                end, line = line_at(start)
+                if line:
+                    yield start, end, line
+            while offset < size:
+                end, line = line_at(offset)
+                if line:
+                    yield offset, end, line
+                offset = end
+
+
+def cell_converter(hint: Any) -> Callable[[str], Any]:
+    if typing.get_origin(hint) in (typing.Union, types.UnionType):
+        args = [a for a in typing.get_args(hint) if a is not type(None)]
+        if len(args) == 1:
+            return cell_converter(args[0])
+        return json.loads
+    if hint is str or (isinstance(hint, type) and issubclass(hint, Enum)):
+        return str
+    if hint is bool:
+        return parse_bool
+    if hint in (int, float):
+        return hint
+    return json.loads  # lists, mappings and anything else spelled as JSON
+
+
+def parse_bool(cell: str) -> bool:
+    match cell.strip().lower():
+        case "true" | "1" | "yes":
+            return True
+        case "false" | "0" | "no":
+            return False
+    raise ValueError(f"invalid boolean '{cell}'")
+
+
+@cache
+def cell_converters(cls: type) -> dict[str, Any]:
+    # Maps the JSON name of each field to a converter for its cell, or to
+    # the converters of a nested object addressed by dotted column names.
+    hints = typing.get_type_hints(cls)
+    converters: dict[str, Any] = {}
+    for f in fields(cls):
+        hint = hints[f.name]
+        converter = cell_converters(hint) \
+            if isinstance(hint, type) and issubclass(hint, OAMObject) \
+            else cell_converter(hint)
+        converters.setdefault(f.metadata.get("json", f.name), converter)
+        converters.setdefault(f.name, converter)
+    return converters
+
+
+def record_class(record: dict) -> type:
+    match record_kind(record):
+        case "entity":
+            return get_asset_by_type(asset_decoder(record["type"])[0])
+        case "edge":
+            return get_relation_by_type(relation_decoder(record["type"])[0])
+    return get_property_by_type(property_decoder(record["type"])[0])
+
+
+def csv_record(header: list[str], row: list[str]) -> dict:
+    # Cells are converted to the type of the field they fill in the asset
+    # model class, so "12345" stays a string where the model wants one.
+    record: dict[str, Any] = {}
+    cells: list[tuple[str, str]] = []
+    for name, cell in zip(header, row):
+        if cell == "":
+            continue
+        if name in RESERVED_COLUMNS:
+            record[name] = cell
+        else:
+            cells.append((name, cell))
+
+    if "from_entity" in record or "to_entity" in record:
+        attributes = record["relation"] = {}
+    elif "entity" in record or "edge" in record:
+        attributes = record["property"] = {}
+    else:
+        attributes = record["asset"] = {}
+
+    converters = cell_converters(record_class(record))
+    for name, cell in cells:
+        target, convert = attributes, converters
+        *parents, leaf = name.split(".")
+        for parent in parents:
+            target = target.setdefault(parent, {})
+            convert = convert.get(parent) if isinstance(convert, dict) else None
+        convert = convert.get(leaf) if isinstance(convert, dict) else None
+        if callable(convert):
+            try:
+                target[leaf] = convert(cell)
+            except ValueError as e:
+                raise ValueError(f"column '{name}': {e}") from e
+        else:
+            target[leaf] = cell  # not a field of the model, left as is
+    return record
+
+
+def read_records(
+        path: str,
+        format: Optional[str] = None,
+        offset: int = 0,
+        retry: Iterable[int] = ()
+) -> Iterator[Record]:
+    # A line that cannot be parsed becomes a record carrying the error, so
+    # it is reported and checkpointed like any other failed record.
+    if format is None:
+        format = "csv" if path.lower().endswith(".csv") else "ndjson"
+
+    if format == "ndjson":
+        for start, end, line in iter_lines(path, offset, retry):
+            try:
+                record = Record(start, end, json.loads(line))
+            except ValueError as e:
+                record = Record(start, end, {}, e)
+            yield record
+        return
+
+    header_end, header = next(
+        ((end, next(csv.reader([line.decode("utf-8")])))
+         for _, end, line in iter_lines(path)), (0, []))
+    for start, end, line in iter_lines(
+            path, max(offset, header_end), retry):
+        try:
+            row = next(csv.reader([line.decode("utf-8")]))
+            record = Record(start, end, csv_record(header, row))
+        except (ValueError, KeyError) as e:
+            record = Record(start, end, {}, e)
+        yield record
+
+
+class Checkpoint:
+    def __init__(self, path: str):
+        self.path = path
+        self.offset = 0
+        self.refs: dict[str, str] = {}
+        self.failed: set[int] = set()
+        self.file: Optional[TextIO] = None
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        valid = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("incomplete line")
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # torn write from an interrupted run
+                valid += len(line)
+                self.offset = entry["offset"]
+                self.refs.update(entry["refs"])
+                self.failed.difference_update(entry.get("retried", ()))
+                self.failed.update(entry.get("failed", ()))
+        # Drop the torn tail so the next save starts on a fresh line.
+        os.truncate(self.path, valid)
+
+    def clear(self):
+        self.close()
+        self.offset = 0
+        self.refs = {}
+        self.failed = set()
+        self.file = open(self.path, "w", encoding="utf-8")
+
+    def save(
+            self,
+            offset: int,
+            refs: dict[str, str],
+            failed: list[int] = (),
+            retried: list[int] = ()
+    ):
+        # failed lists the offsets of records to retry on resume; retried
+        # those of earlier failures that have now been imported.
+        if self.file is None:
+            self.file = open(self.path, "a", encoding="utf-8")
+        offset = max(offset, self.offset)
+        self.file.write(json.dumps({
+            "offset": offset, "refs": refs,
+            "failed": list(failed), "retried": list(retried)}) + "\n")
+        self.file.flush()
+        self.offset = offset
+        self.refs.update(refs)
+        self.failed.difference_update(retried)
+        self.failed.update(failed)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class Importer:
+    def __init__(
+            self,
+            client: AsyncBrokerClient,
+            concurrency: int = DEFAULT_CONCURRENCY,
+            batch_size: int = DEFAULT_BATCH_SIZE,
+            checkpoint: Optional[Checkpoint] = None,
+            report_interval: float = 5.0,
+            report: TextIO = sys.stderr
+    ):
+        self.client = client
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.checkpoint = checkpoint
+        self.report_interval = report_interval
+        self.report = report
+        self.refs: dict[str, str] = {} if checkpoint is None \
+            else dict(checkpoint.refs)
+        self.kinds: dict[str, str] = {}
+        self.failed: set[str] = set()
+        self.stats = ImportStats()
+
+    async def run(self, records: Iterator[Record]) -> ImportStats:
+        self.stats = ImportStats()
+        reported = time.monotonic()
+        batch: list[Record] = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                await self.emit_batch(batch)
+                batch = []
+                if time.monotonic() - reported >= self.report_interval:
+                    reported = time.monotonic()
+                    self.print_progress()
+        if batch:
+            await self.emit_batch(batch)
+        self.print_progress(final=True)
+        return self.stats
+
+    async def emit_batch(self, batch: list[Record]):
+        # Records of a batch are emitted concurrently; a record whose
+        # endpoint is created earlier in the same batch waits for it.
+        slots = asyncio.Semaphore(self.concurrency)
+        pending: dict[str, asyncio.Future] = {}
+        kinds: dict[str, str] = {}
+        created: dict[str, str] = {}
+        failed: list[int] = []
+        retried: list[int] = []
+        loop = asyncio.get_running_loop()
+        for record in batch:
+            ref = record_ref(record.data)
+            if record.error is None and ref is not None and ref not in pending:
+                pending[ref] = loop.create_future()
+                kinds[ref] = record_kind(record.data)
+
+        async def emit(record: Record):
+            ref = None if record.error is not None else record_ref(record.data)
+            try:
+                if record.error is not None:
+                    raise record.error
+                id = await self.emit(record.data, pending, kinds, slots)
+            except Exception as e:
+                self.stats.failed += 1
+                failed.append(record.offset)
+                logger.warning(f"record at byte {record.offset}: {e!r}")
+                if ref is not None:
+                    self.failed.add(ref)
+                    if not pending[ref].done():
+                        pending[ref].set_exception(e)
+                        pending[ref].exception()
+                return
+            self.stats.created += 1
+            if self.checkpoint is not None \
+               and record.offset in self.checkpoint.failed:
+                retried.append(record.offset)
+            if ref is not None:
+                created[ref] = id
+                self.failed.discard(ref)
+                if not pending[ref].done():
+                    pending[ref].set_result(id)
+
+        await asyncio.gather(*(emit(record) for record in batch))
+        self.stats.records += len(batch)
+        self.refs.update(created)
+        self.kinds.update(
+            (ref, kind) for ref, kind in kinds.items() if ref in created)
+        if self.checkpoint is not None:
+            self.checkpoint.save(
+                max(record.end for record in batch), created,
+                sorted(failed), retried)
+
+    async def resolve(
+            self,
+            ref: str,
+            kind: str,
+            pending: dict[str, asyncio.Future],
+            kinds: dict[str, str]
+    ) -> str:
+        found = kinds.get(ref) or self.kinds.get(ref)
+        if found is not None and found != kind:
+            raise ValueError(
+                f"reference '{ref}' is a {found} record, expected {kind}")
+        if ref in self.refs:
+            return self.refs[ref]
+        if ref in pending:
+            return await pending[ref]
+        if ref in self.failed:
+            raise ValueError(f"reference '{ref}' failed to import")
+        return ref  # not imported by us: an ID already known to the broker
+
+    async def emit(
+            self,
+            data: dict,
+            pending: dict[str, asyncio.Future],
+            kinds: dict[str, str],
+            slots: asyncio.Semaphore
+    ) -> str:
+        kind = record_kind(data)
+        ref = record_ref(data)
+        for key, _ in REFERENCES.get(kind, ()):
+            if ref is not None and data.get(key) == ref:
+                raise ValueError(f"record references itself through '{key}'")
+
+        if kind == "entity":
+            _, decode = asset_decoder(data["type"])
+            asset = decode(data["asset"])
+            async with slots:
+                return (await self.client.create_entity(asset)).id
+
+        if kind == "edge":
+            _, decode = relation_decoder(data["type"])
+            relation = decode(data["relation"])
+            from_entity = await self.resolve(
+                data["from_entity"], "entity", pending, kinds)
+            to_entity = await self.resolve(
+                data["to_entity"], "entity", pending, kinds)
+            async with slots:
+                return (await self.client.create_edge(
+                    relation, from_entity, to_entity)).id
+
+        _, decode = property_decoder(data["type"])
+        prop = decode(data["property"])
+        if kind == "entity_tag":
+            entity = await self.resolve(
+                data["entity"], "entity", pending, kinds)
+            async with slots:
+                return (await self.client.create_entity_tag(prop, entity)).id
+
+        edge = await self.resolve(data["edge"], "edge", pending, kinds)
+        async with slots:
+            return (await self.client.create_edge_tag(prop, edge)).id
+
+    def print_progress(self, final: bool = False):
+        print(f"{'imported' if final else 'importing'}: "
+              f"{self.stats.records} records, {self.stats.created} created, "
+              f"{self.stats.failed} failed, {self.stats.rate:.0f} records/s",
+              file=self.report)
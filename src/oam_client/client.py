@@ -1,17 +1,26 @@
-import httpx
-from httpx_sse import connect_sse
-from asset_model import Asset, Relation, Property
-from typing import Callable
+from __future__ import annotations
+from contextlib import nullcontext
+from enum import Enum
+from typing import Callable, Iterable, Optional, TYPE_CHECKING
 from .messages import (
+    ServerAction,
     Event,
     Entity,
     Edge,
     EdgeTag,
     EntityTag
 )
-from .base import BrokerClientBase
+from .base import BrokerClientBase, DEFAULT_QUEUE_SIZE
+from .sse import SSEParser
+from .touches import TouchCollapser
+from .limits import RateLimiter, AdaptiveConcurrency, Sample, Limiter
 from logging import getLogger
 
+if TYPE_CHECKING:
+    from asset_model import Asset, Relation, Property
+    from .coalescing import WriteCoalescer
+    from .hub import SyncSubscription
+
 HandlerFunction = Callable[[Event], None]
 
 logger = getLogger(__name__)
@@ -24,55 +33,166 @@ class BrokerClient(BrokerClientBase):
             path: str,
             payload: str
     ) -> str:
-        with httpx.Client(
+        import httpx
+
+        limit = nullcontext(Sample()) if self.limiter is None \
+            else self.limiter.request(path)
+
+        with limit as sample, httpx.Client(
                 http2=True,
-                verify=self.ssl_context
+                verify=self.ssl_context,
+                transport=self.transport
         ) as client:
+            content, headers = self._encode_payload(payload)
             response = client.request(
                 method=method.upper(),
                 url=self.url + path,
-                headers={
-                    "Content-Type": "application/json; charset=utf-8"
-                },
-                content=payload.encode("utf-8"),
+                headers=headers,
+                content=content,
             )
+            if "Content-Encoding" in headers \
+               and self._compression_refused(response.status_code):
+                content, headers = self._encode_payload(payload)
+                response = client.request(
+                    method=method.upper(),
+                    url=self.url + path,
+                    headers=headers,
+                    content=content,
+                )
+            sample.status = response.status_code
 
             logger.debug(f"__send:response:{response.text}")
             return response.text
 
+    def __write(
+            self,
+            method: str,
+            path: str,
+            payload: str
+    ) -> str:
+        if self.coalescer is None:
+            return self.__send(method, path, payload)
+        return self.coalescer.submit(method, path, payload)
+
+    def _coalescer(self, window: float) -> WriteCoalescer:
+        from .coalescing import WriteCoalescer
+
+        return WriteCoalescer(window, self.__send)
+
+    def _limiter(
+            self,
+            rate: Optional[RateLimiter],
+            concurrency: Optional[AdaptiveConcurrency]
+    ) -> Limiter:
+        return Limiter(rate, concurrency)
+
     def __listen(
             self,
             method: str,
             path: str,
-            handler: HandlerFunction
+            handler: HandlerFunction,
+            touch_window: Optional[float] = None
     ):
-        while True:
-            try:
-                with httpx.Client(
-                        http2=True,
-                        verify=self.ssl_context,
-                        timeout=httpx.Timeout(None, connect=10.0)
-                ) as client:
-                    with connect_sse(
-                            client=client,
-                            method=method.upper(),
-                            url=self.url + path
-                    ) as event_source:
-                        for sse in event_source.iter_sse():
-                            handler(Event.from_sse(sse))
-
-            except (httpx.ReadTimeout,
-                    httpx.ConnectError,
-                    httpx.HTTPStatusError):
-                continue
-            except Exception as e:
-                raise e
+        import httpx
+        import threading
+
+        collapser = None if touch_window is None \
+            else TouchCollapser(touch_window)
+        # The expiry thread and the stream share the collapser and the
+        # handler, so both run under one lock.
+        lock = threading.Lock()
+        stopped = threading.Event()
+        failures: list[Exception] = []
+
+        def expire():
+            while not stopped.wait(collapser.remaining()):
+                with lock:
+                    try:
+                        for event in collapser.expire():
+                            handler(event)
+                    except Exception as e:
+                        failures.append(e)
+                        return
+
+        expiry = None
+        if collapser is not None:
+            expiry = threading.Thread(
+                target=expire, name="oam-client-touches", daemon=True)
+            expiry.start()
+
+        try:
+            while True:
+                try:
+                    with httpx.Client(
+                            http2=True,
+                            verify=self.ssl_context,
+                            timeout=httpx.Timeout(None, connect=10.0),
+                            transport=self.transport
+                    ) as client:
+                        with client.stream(
+                                method=method.upper(),
+                                url=self.url + path,
+                                headers=self._listen_headers()
+                        ) as response:
+                            if response.status_code == 204:
+                                # No Content tells the client to stop
+                                # reconnecting.
+                                break
+                            response.raise_for_status()
+                            parser = SSEParser()
+                            for chunk in response.iter_bytes():
+                                for sse in parser.feed(chunk):
+                                    if collapser is None:
+                                        handler(Event.from_sse(sse))
+                                        continue
+                                    with lock:
+                                        for event in collapser.push(
+                                                sse.event, sse.data):
+                                            handler(event)
+                                if failures:
+                                    raise failures[0]
+
+                except (httpx.ReadTimeout,
+                        httpx.ConnectError,
+                        httpx.HTTPStatusError):
+                    continue
+        finally:
+            if expiry is not None:
+                stopped.set()
+                expiry.join()
+                with lock:
+                    events, errors = collapser.drain()
+                    for event in events:
+                        handler(event)
+                failures.extend(errors)
+        if failures:
+            raise failures[0]
 
     def listen_events(
             self,
-            handler: HandlerFunction
+            handler: HandlerFunction,
+            touch_window: Optional[float] = None
     ):
-        self.__listen("GET", "/listen", handler)
+        self.__listen("GET", "/listen", handler, touch_window)
+
+    def subscribe(
+            self,
+            actions: Optional[Iterable[ServerAction | str]] = None,
+            types: Optional[Iterable[Enum | str]] = None,
+            maxsize: int = DEFAULT_QUEUE_SIZE
+    ) -> SyncSubscription:
+        from .hub import SubscriptionHub
+
+        if self.hub is None:
+            self.hub = SubscriptionHub(self)
+        return self.hub.subscribe(actions, types, maxsize)
+
+    def unsubscribe(
+            self,
+            subscription: SyncSubscription
+    ):
+        if self.hub is not None:
+            self.hub.unsubscribe(subscription)
 
     def create_entity(
             self,
@@ -89,14 +209,14 @@ class BrokerClient(BrokerClientBase):
     ) -> Entity:
         entity = Entity(asset.asset_type, asset)
         return Entity.from_json(
-            self.__send("put", f"/emit/entity/{id}", entity.to_json()))
+            self.__write("put", f"/emit/entity/{id}", entity.to_json()))
 
     def delete_entity(
             self,
             id: str
     ) -> Entity:
         return Entity.from_json(
-            self.__send("delete", f"/emit/entity/{id}", ""))
+            self.__write("delete", f"/emit/entity/{id}", ""))
 
     def create_edge(
             self,
@@ -121,14 +241,14 @@ class BrokerClient(BrokerClientBase):
             relation.relation_type, relation,
             from_entity, to_entity)
         return Edge.from_json(
-            self.__send("put", f"/emit/edge/{id}", edge.to_json()))
+            self.__write("put", f"/emit/edge/{id}", edge.to_json()))
 
     def delete_edge(
             self,
             id: str
     ) -> Edge:
         return Edge.from_json(
-            self.__send("delete", f"/emit/edge/{id}", ""))
+            self.__write("delete", f"/emit/edge/{id}", ""))
 
     def create_entity_tag(
             self,
@@ -150,7 +270,7 @@ class BrokerClient(BrokerClientBase):
         entity_tag = EntityTag(
             property.property_type, property, entity)
         return EntityTag.from_json(
-            self.__send(
+            self.__write(
                 "put", f"/emit/entity_tag/{id}", entity_tag.to_json()))
 
     def delete_entity_tag(
@@ -158,7 +278,7 @@ class BrokerClient(BrokerClientBase):
             id: str
     ) -> EntityTag:
         return EntityTag.from_json(
-            self.__send("delete", f"/emit/entity_tag/{id}", ""))
+            self.__write("delete", f"/emit/entity_tag/{id}", ""))
 
     def create_edge_tag(
             self,
@@ -179,7 +299,7 @@ class BrokerClient(BrokerClientBase):
         edge_tag = EdgeTag(
             property.property_type, property, edge)
         return EdgeTag.from_json(
-            self.__send(
+            self.__write(
                 "put", f"/emit/edge_tag/{id}", edge_tag.to_json()))
 
     def delete_edge_tag(
@@ -187,4 +307,4 @@ class BrokerClient(BrokerClientBase):
             id: str
     ) -> EdgeTag:
         return EdgeTag.from_json(
-            self.__send("delete", f"/emit/entity_tag/{id}", ""))
+            self.__write("delete", f"/emit/entity_tag/{id}", ""))
@@ -0,0 +1,162 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+SendFunction = Callable[[str, str, str], str]
+AsyncSendFunction = Callable[[str, str, str], Awaitable[str]]
+
+DEFAULT_FLUSH_WORKERS = 16
+
+
+@dataclass
+class CoalescingStats:
+    submitted: int = 0
+    sent: int = 0
+
+    @property
+    def saved(self) -> int:
+        return self.submitted - self.sent
+
+
+@dataclass
+class PendingWrite:
+    method: str
+    payload: str
+    waiters: list[Any] = field(default_factory=list)
+
+
+class PendingWrites:
+    def __init__(self):
+        self.writes: dict[str, list[PendingWrite]] = {}
+        self.stats = CoalescingStats()
+
+    def add(self, method: str, path: str, payload: str, waiter: Any):
+        # Writes are keyed by their path, which carries the object ID.
+        # A pending update is superseded by a later update (last write
+        # wins) or delete, and repeated deletes collapse into one; any
+        # other sequence is kept in order.
+        self.stats.submitted += 1
+        method = method.lower()
+        writes = self.writes.setdefault(path, [])
+        last = writes[-1] if writes else None
+        if last is not None and last.method == "put" \
+           and method in ("put", "delete"):
+            last.method = method
+            last.payload = payload
+        elif last is not None and last.method == "delete" \
+                and method == "delete":
+            pass
+        else:
+            last = PendingWrite(method, payload)
+            writes.append(last)
+            self.stats.sent += 1
+        last.waiters.append(waiter)
+
+    def take(self) -> dict[str, list[PendingWrite]]:
+        writes, self.writes = self.writes, {}
+        return writes
+
+
+class WriteCoalescer:
+    def __init__(
+            self,
+            window: float,
+            send: SendFunction,
+            workers: int = DEFAULT_FLUSH_WORKERS
+    ):
+        self.window = window
+        self.send = send
+        self.workers = workers
+        self.pending = PendingWrites()
+        self.lock = threading.Lock()
+        self.timer: Optional[threading.Timer] = None
+        self.executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def stats(self) -> CoalescingStats:
+        return self.pending.stats
+
+    def submit(self, method: str, path: str, payload: str) -> str:
+        future: Future[str] = Future()
+        with self.lock:
+            self.pending.add(method, path, payload, future)
+            if self.timer is None:
+                self.timer = threading.Timer(self.window, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+        return future.result()
+
+    def flush(self):
+        with self.lock:
+            writes = self.pending.take()
+            self.timer = None
+            if len(writes) > 1 and self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix="oam-client-flush")
+        # Paths are independent: send them in parallel as the callers
+        # would have, keeping the order of writes within a path.
+        for path, ops in writes.items():
+            if len(writes) == 1:
+                self.__send_ops(path, ops)
+            else:
+                self.executor.submit(self.__send_ops, path, ops)
+
+    def __send_ops(self, path: str, ops: list[PendingWrite]):
+        for op in ops:
+            try:
+                result = self.send(op.method, path, op.payload)
+            except Exception as e:
+                for waiter in op.waiters:
+                    waiter.set_exception(e)
+            else:
+                for waiter in op.waiters:
+                    waiter.set_result(result)
+
+
+class AsyncWriteCoalescer:
+    def __init__(self, window: float, send: AsyncSendFunction):
+        self.window = window
+        self.send = send
+        self.pending = PendingWrites()
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.tasks: set[asyncio.Task] = set()
+
+    @property
+    def stats(self) -> CoalescingStats:
+        return self.pending.stats
+
+    async def submit(self, method: str, path: str, payload: str) -> str:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.add(method, path, payload, future)
+        if self.timer is None:
+            self.timer = loop.call_later(self.window, self.__schedule_flush)
+        return await future
+
+    def __schedule_flush(self):
+        task = asyncio.create_task(self.flush())
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        writes = self.pending.take()
+        await asyncio.gather(*(
+            self.__send_ops(path, ops) for path, ops in writes.items()))
+
+    async def __send_ops(self, path: str, ops: list[PendingWrite]):
+        for op in ops:
+            try:
+                result = await self.send(op.method, path, op.payload)
+            except Exception as e:
+                for waiter in op.waiters:
+                    if not waiter.done():
+                        waiter.set_exception(e)
+            else:
+                for waiter in op.waiters:
+                    if not waiter.done():
+                        waiter.set_result(result)
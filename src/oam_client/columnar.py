@@ -0,0 +1,244 @@
+from array import array
+from dataclasses import fields
+from datetime import datetime, timezone
+from enum import Enum
+from functools import cache
+from typing import Any, Callable, Iterable, Iterator, Optional
+from asset_model import AssetType, RelationType, PropertyType
+from .messages import Event, Edge, EntityTag, EdgeTag, ServerAction
+
+ACTIONS = tuple(ServerAction)
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+# Type codes are shared by every batch, so they can be compared, filtered
+# and joined across batches like action codes.
+TYPES = [t.value for enum in (AssetType, RelationType, PropertyType)
+         for t in enum]
+TYPE_CODES = {name: code for code, name in enumerate(TYPES)}
+
+NAT = -(2 ** 63)
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+DEFAULT_BATCH_SIZE = 65536
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError(
+            "columnar export to NumPy requires the 'numpy' package, "
+            "install it with `pip install oam-client[numpy]`") from e
+    return numpy
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "columnar export to Arrow requires the 'pyarrow' package, "
+            "install it with `pip install oam-client[arrow]`") from e
+    return pyarrow
+
+
+def type_code(name: str) -> int:
+    code = TYPE_CODES.get(name)
+    if code is None:
+        # A type newer than the installed asset model gets the next code.
+        code = TYPE_CODES.setdefault(name, len(TYPES))
+        if code == len(TYPES):
+            TYPES.append(name)
+    return code
+
+
+def timestamp_ns(value: Optional[str | datetime]) -> int:
+    if value is None:
+        return NAT
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    delta = value - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000_000 \
+        + delta.microseconds * 1000
+
+
+@cache
+def field_names(cls: type, attributes: tuple[str, ...]) -> tuple[Optional[str], ...]:
+    # Attributes are selected by their JSON name, as in OAMObject.to_dict.
+    names = {}
+    for field in fields(cls):
+        names.setdefault(field.metadata.get("json", field.name), field.name)
+    return tuple(names.get(attribute) for attribute in attributes)
+
+
+class EventBatch:
+    def __init__(
+            self,
+            attributes: Iterable[str] = (),
+            capacity: int = DEFAULT_BATCH_SIZE
+    ):
+        self.attributes = tuple(attributes)
+        self.capacity = capacity
+        self.clear()
+
+    def clear(self):
+        self.action = array("B")
+        self.type = array("H")
+        self.created_at = array("q")
+        self.last_seen = array("q")
+        self.id: list[Optional[str]] = []
+        self.from_entity: list[Optional[str]] = []
+        self.to_entity: list[Optional[str]] = []
+        self.subject: list[Optional[str]] = []
+        self.values: dict[str, list[Any]] = {
+            name: [] for name in self.attributes}
+
+    def __len__(self) -> int:
+        return len(self.action)
+
+    @property
+    def full(self) -> bool:
+        return len(self.action) >= self.capacity
+
+    def append(self, event: Event):
+        data = event.data
+        self.action.append(ACTION_CODES[event.action])
+        self.type.append(type_code(data.type.value))
+        self.id.append(data.id)
+        self.created_at.append(timestamp_ns(data.created_at))
+        self.last_seen.append(timestamp_ns(data.last_seen))
+
+        match data:
+            case Edge():
+                obj = data.relation
+                self.from_entity.append(data.from_entity)
+                self.to_entity.append(data.to_entity)
+                self.subject.append(None)
+            case EntityTag():
+                obj = data.property
+                self.from_entity.append(None)
+                self.to_entity.append(None)
+                self.subject.append(data.entity)
+            case EdgeTag():
+                obj = data.property
+                self.from_entity.append(None)
+                self.to_entity.append(None)
+                self.subject.append(data.edge)
+            case _:
+                obj = data.asset
+                self.from_entity.append(None)
+                self.to_entity.append(None)
+                self.subject.append(None)
+
+        if self.attributes:
+            for attribute, name in zip(
+                    self.attributes,
+                    field_names(type(obj), self.attributes)):
+                value = None if name is None else getattr(obj, name)
+                if isinstance(value, Enum):
+                    value = value.value
+                self.values[attribute].append(value)
+
+    def extend(self, events: Iterable[Event]):
+        for event in events:
+            self.append(event)
+
+    def type_names(self) -> list[str]:
+        return list(TYPES)
+
+    def to_numpy(self) -> dict[str, Any]:
+        # String columns are object arrays with None for missing values;
+        # timestamps are int64 nanoseconds since the epoch, NAT (the
+        # datetime64 NaT value) when unset.
+        np = _numpy()
+
+        def objects(values: list) -> Any:
+            column = np.empty(len(values), dtype=object)
+            column[:] = values
+            return column
+
+        columns = {
+            "action": np.array(self.action, dtype=np.uint8),
+            "type": np.array(self.type, dtype=np.uint16),
+            "id": objects(self.id),
+            "created_at": np.array(self.created_at, dtype=np.int64),
+            "last_seen": np.array(self.last_seen, dtype=np.int64),
+            "from_entity": objects(self.from_entity),
+            "to_entity": objects(self.to_entity),
+            "subject": objects(self.subject),
+        }
+        for name, values in self.values.items():
+            columns[name] = objects(values)
+        return columns
+
+    def to_arrow(self) -> Any:
+        pa = _pyarrow()
+        np = _numpy()
+
+        def timestamps(values: array) -> Any:
+            column = np.array(values, dtype=np.int64)
+            return pa.array(
+                column, type=pa.timestamp("ns", tz="UTC"),
+                mask=column == NAT)
+
+        actions = pa.array([action.value for action in ACTIONS], pa.string())
+        types = pa.array(self.type_names(), pa.string())
+        columns = {
+            "action": pa.DictionaryArray.from_arrays(
+                pa.array(np.array(self.action, dtype=np.uint8)), actions),
+            "type": pa.DictionaryArray.from_arrays(
+                pa.array(np.array(self.type, dtype=np.uint16)), types),
+            "id": pa.array(self.id, pa.string()),
+            "created_at": timestamps(self.created_at),
+            "last_seen": timestamps(self.last_seen),
+            "from_entity": pa.array(self.from_entity, pa.string()),
+            "to_entity": pa.array(self.to_entity, pa.string()),
+            "subject": pa.array(self.subject, pa.string()),
+        }
+        for name, values in self.values.items():
+            columns[name] = pa.array(values)
+        return pa.RecordBatch.from_pydict(columns)
+
+
+def batches(
+        events: Iterable[Event],
+        attributes: Iterable[str] = (),
+        size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[EventBatch]:
+    batch = EventBatch(attributes, size)
+    for event in events:
+        batch.append(event)
+        if batch.full:
+            yield batch
+            batch = EventBatch(attributes, size)
+    if len(batch):
+        yield batch
+
+
+class BatchCollector:
+    def __init__(
+            self,
+            on_batch: Callable[[EventBatch], Any],
+            attributes: Iterable[str] = (),
+            size: int = DEFAULT_BATCH_SIZE
+    ):
+        self.on_batch = on_batch
+        self.attributes = tuple(attributes)
+        self.size = size
+        self.batch = EventBatch(self.attributes, size)
+
+    def __call__(self, event: Event):
+        self.batch.append(event)
+        if self.batch.full:
+            self.flush()
+
+    async def handle(self, event: Event):
+        self(event)
+
+    def flush(self):
+        if not len(self.batch):
+            return
+        batch, self.batch = self.batch, EventBatch(self.attributes, self.size)
+        self.on_batch(batch)
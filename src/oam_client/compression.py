@@ -0,0 +1,60 @@
+import zlib
+from typing import Optional
+
+GZIP = "gzip"
+ZSTD = "zstd"
+
+ENCODINGS = (ZSTD, GZIP)
+
+DEFAULT_THRESHOLD = 1024
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(
+            "zstd compression requires the 'zstandard' package, "
+            "install it with `pip install oam-client[zstd]`") from e
+    return zstandard
+
+
+def check_encoding(encoding: Optional[str]) -> Optional[str]:
+    if encoding is None:
+        return None
+    encoding = encoding.lower()
+    if encoding not in ENCODINGS:
+        raise ValueError(
+            f"unsupported compression '{encoding}', "
+            f"expected one of {', '.join(ENCODINGS)}")
+    if encoding == ZSTD:
+        _zstandard()
+    return encoding
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    match encoding:
+        case "gzip":
+            c = zlib.compressobj(
+                6 if level is None else level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            return c.compress(data) + c.flush()
+        case "zstd":
+            zstandard = _zstandard()
+            return zstandard.ZstdCompressor(
+                level=3 if level is None else level).compress(data)
+        case _:
+            raise ValueError(f"unsupported compression '{encoding}'")
+
+
+def accept_encoding(preferred: Optional[str]) -> str:
+    encodings = [preferred] if preferred else []
+    for encoding in ENCODINGS:
+        if encoding in encodings:
+            continue
+        if encoding == ZSTD:
+            try:
+                _zstandard()
+            except ImportError:
+                continue
+        encodings.append(encoding)
+    return ", ".join(encodings)
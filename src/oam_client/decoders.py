@@ -0,0 +1,59 @@
+from dataclasses import fields
+from functools import cache
+from typing import Any, Callable, Mapping, Optional
+from asset_model import (
+    OAMObject,
+    AssetType,
+    RelationType,
+    PropertyType,
+    get_asset_by_type,
+    get_relation_by_type,
+    get_property_by_type
+)
+
+Decoder = Callable[[Mapping[str, Any]], OAMObject]
+
+
+@cache
+def object_decoder(cls: type) -> Decoder:
+    # Same key resolution as OAMObject.from_dict (first field whose json
+    # name or attribute name matches, nested OAMObjects decoded
+    # recursively), computed once per class instead of once per payload.
+    keys: dict[str, tuple[str, Optional[Decoder]]] = {}
+    for field in fields(cls):
+        nested = None
+        if isinstance(field.type, type) and issubclass(field.type, OAMObject):
+            nested = object_decoder(field.type)
+        if "json" in field.metadata:
+            keys.setdefault(field.metadata["json"], (field.name, nested))
+        keys.setdefault(field.name, (field.name, nested))
+
+    def decode(d: Mapping[str, Any]) -> OAMObject:
+        kwargs = {}
+        for key, value in d.items():
+            target = keys.get(key)
+            if target is None:
+                continue
+            name, nested = target
+            kwargs[name] = value if nested is None else nested(value)
+        return cls(**kwargs)
+
+    return decode
+
+
+@cache
+def asset_decoder(type_name: str) -> tuple[AssetType, Decoder]:
+    asset_type = AssetType(type_name)
+    return asset_type, object_decoder(get_asset_by_type(asset_type))
+
+
+@cache
+def relation_decoder(type_name: str) -> tuple[RelationType, Decoder]:
+    rel_type = RelationType(type_name)
+    return rel_type, object_decoder(get_relation_by_type(rel_type))
+
+
+@cache
+def property_decoder(type_name: str) -> tuple[PropertyType, Decoder]:
+    prop_type = PropertyType(type_name)
+    return prop_type, object_decoder(get_property_by_type(prop_type))
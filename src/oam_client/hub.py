@@ -0,0 +1,206 @@
+import asyncio
+import queue
+import threading
+from enum import Enum
+from typing import Iterable, Optional, TYPE_CHECKING
+from .messages import Event, ServerAction
+from .base import DEFAULT_QUEUE_SIZE
+
+if TYPE_CHECKING:
+    from .client import BrokerClient
+    from .async_client import AsyncBrokerClient
+
+
+class Subscription:
+    actions: Optional[frozenset[ServerAction]]
+    types: Optional[frozenset[str]]
+    dropped: int
+    error: Optional[BaseException]
+
+    def __init__(
+            self,
+            actions: Optional[Iterable[ServerAction | str]] = None,
+            types: Optional[Iterable[Enum | str]] = None,
+    ):
+        self.actions = None if actions is None \
+            else frozenset(ServerAction(a) for a in actions)
+        self.types = None if types is None \
+            else frozenset(t.value if isinstance(t, Enum) else t for t in types)
+        self.dropped = 0
+        self.error = None
+
+    def matches(self, event: Event) -> bool:
+        return (self.actions is None or event.action in self.actions) \
+            and (self.types is None or event.data.type in self.types)
+
+    def fail(self, error: Optional[BaseException]):
+        # The hub's listener stopped: end the subscription, and re-raise
+        # its error to the consumer if it failed.
+        self.error = error
+        self.offer(None)
+
+
+class SyncSubscription(Subscription):
+    def __init__(
+            self,
+            hub: "SubscriptionHub",
+            actions: Optional[Iterable[ServerAction | str]] = None,
+            types: Optional[Iterable[Enum | str]] = None,
+            maxsize: int = DEFAULT_QUEUE_SIZE
+    ):
+        super().__init__(actions, types)
+        self.hub = hub
+        self.queue: queue.Queue[Optional[Event]] = queue.Queue(maxsize)
+
+    def offer(self, event: Optional[Event]):
+        # Drop the oldest pending event rather than blocking the dispatcher.
+        while True:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        event = self.queue.get(timeout=timeout)
+        if event is None and self.error is not None:
+            raise self.error
+        return event
+
+    def close(self):
+        self.hub.unsubscribe(self)
+        self.offer(None)
+
+    def __iter__(self):
+        while (event := self.get()) is not None:
+            yield event
+
+
+class AsyncSubscription(Subscription):
+    def __init__(
+            self,
+            hub: "AsyncSubscriptionHub",
+            actions: Optional[Iterable[ServerAction | str]] = None,
+            types: Optional[Iterable[Enum | str]] = None,
+            maxsize: int = DEFAULT_QUEUE_SIZE
+    ):
+        super().__init__(actions, types)
+        self.hub = hub
+        self.queue: asyncio.Queue[Optional[Event]] = asyncio.Queue(maxsize)
+
+    def offer(self, event: Optional[Event]):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self) -> Optional[Event]:
+        event = await self.queue.get()
+        if event is None and self.error is not None:
+            raise self.error
+        return event
+
+    def close(self):
+        self.hub.unsubscribe(self)
+        self.offer(None)
+
+    async def __aiter__(self):
+        while (event := await self.get()) is not None:
+            yield event
+
+
+class SubscriptionHub:
+    def __init__(self, client: "BrokerClient"):
+        self.client = client
+        self.subscriptions: list[SyncSubscription] = []
+        self.lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+
+    def subscribe(
+            self,
+            actions: Optional[Iterable[ServerAction | str]] = None,
+            types: Optional[Iterable[Enum | str]] = None,
+            maxsize: int = DEFAULT_QUEUE_SIZE
+    ) -> SyncSubscription:
+        subscription = SyncSubscription(self, actions, types, maxsize)
+        with self.lock:
+            self.subscriptions = self.subscriptions + [subscription]
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run,
+                    name="oam-client-hub",
+                    daemon=True)
+                self.thread.start()
+        return subscription
+
+    def run(self):
+        error = None
+        try:
+            self.client.listen_events(self.dispatch)
+        except Exception as e:
+            error = e
+        with self.lock:
+            subscriptions, self.subscriptions = self.subscriptions, []
+            self.thread = None
+        for subscription in subscriptions:
+            subscription.fail(error)
+
+    def unsubscribe(self, subscription: SyncSubscription):
+        with self.lock:
+            self.subscriptions = [
+                s for s in self.subscriptions if s is not subscription]
+
+    def dispatch(self, event: Event):
+        for subscription in self.subscriptions:
+            if subscription.matches(event):
+                subscription.offer(event)
+
+
+class AsyncSubscriptionHub:
+    def __init__(self, client: "AsyncBrokerClient"):
+        self.client = client
+        self.subscriptions: list[AsyncSubscription] = []
+        self.task: Optional[asyncio.Task] = None
+
+    def subscribe(
+            self,
+            actions: Optional[Iterable[ServerAction | str]] = None,
+            types: Optional[Iterable[Enum | str]] = None,
+            maxsize: int = DEFAULT_QUEUE_SIZE
+    ) -> AsyncSubscription:
+        subscription = AsyncSubscription(self, actions, types, maxsize)
+        self.subscriptions = self.subscriptions + [subscription]
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+        return subscription
+
+    async def run(self):
+        error = None
+        try:
+            await self.client.listen_events(self.dispatch)
+        except Exception as e:
+            error = e
+        # A listener cancelled by unsubscribe may return after a new one
+        # took over; only the current listener ends the subscriptions.
+        if self.task is not asyncio.current_task():
+            return
+        self.task = None
+        subscriptions, self.subscriptions = self.subscriptions, []
+        for subscription in subscriptions:
+            subscription.fail(error)
+
+    def unsubscribe(self, subscription: AsyncSubscription):
+        self.subscriptions = [
+            s for s in self.subscriptions if s is not subscription]
+        if not self.subscriptions and self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def dispatch(self, event: Event):
+        for subscription in self.subscriptions:
+            if subscription.matches(event):
+                subscription.offer(event)
@@ -0,0 +1,198 @@
+import threading
+import time
+from contextlib import contextmanager, asynccontextmanager
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+OVERLOAD_STATUS = (429, 503)
+
+
+@dataclass
+class Sample:
+    status: Optional[int] = None
+
+
+def endpoint(path: str) -> str:
+    # "/emit/entity/<id>" and "/emit/entity" share the same bucket.
+    return "/".join(path.split("/", 3)[:3])
+
+
+class TokenBucket:
+    def __init__(
+            self,
+            rate: float,
+            burst: Optional[float] = None,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1.0, rate if burst is None else burst)
+        self.clock = clock
+        self.tokens = self.burst
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        # Take a token and return how long the caller must wait before
+        # using it; the balance goes negative so waiters queue up fairly.
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class RateLimiter:
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst
+        self.buckets: dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def reserve(self, path: str) -> float:
+        key = endpoint(path)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            with self.lock:
+                bucket = self.buckets.setdefault(
+                    key, TokenBucket(self.rate, self.burst))
+        return bucket.reserve()
+
+
+class AdaptiveConcurrency:
+    def __init__(
+            self,
+            initial: int = 8,
+            minimum: int = 1,
+            maximum: int = 256,
+            backoff: float = 0.7,
+            tolerance: float = 2.0,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.clock = clock
+        self.current = float(max(minimum, min(initial, maximum)))
+        self.baseline: Optional[float] = None
+        self.decreased = 0.0
+        self.inflight = 0
+        self.lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        return int(self.current)
+
+    def try_acquire(self) -> bool:
+        with self.lock:
+            if self.inflight >= self.limit:
+                return False
+            self.inflight += 1
+            return True
+
+    def release(self, latency: float, status: Optional[int]):
+        with self.lock:
+            self.inflight -= 1
+            self.on_sample(latency, status)
+
+    def on_sample(self, latency: float, status: Optional[int]):
+        # AIMD: grow by roughly one slot per round trip while latency
+        # stays within tolerance of the best observed, shrink
+        # multiplicatively (at most once per round trip) on overload
+        # responses, transport errors or queueing latency.
+        if status is not None and status not in OVERLOAD_STATUS:
+            self.baseline = latency if self.baseline is None \
+                else min(latency, self.baseline * 1.001)
+
+        overloaded = status is None or status in OVERLOAD_STATUS \
+            or (self.baseline is not None
+                and latency > self.baseline * self.tolerance)
+
+        if overloaded:
+            now = self.clock()
+            if now - self.decreased >= latency:
+                self.decreased = now
+                self.current = max(
+                    float(self.minimum), self.current * self.backoff)
+        else:
+            self.current = min(
+                float(self.maximum), self.current + 1.0 / self.current)
+
+
+class Limiter:
+    def __init__(
+            self,
+            rate: Optional[RateLimiter] = None,
+            concurrency: Optional[AdaptiveConcurrency] = None
+    ):
+        self.rate = rate
+        self.concurrency = concurrency
+        self.condition = threading.Condition()
+
+    @contextmanager
+    def request(self, path: str):
+        if self.rate is not None:
+            delay = self.rate.reserve(path)
+            if delay > 0:
+                time.sleep(delay)
+
+        if self.concurrency is None:
+            yield Sample()
+            return
+
+        with self.condition:
+            self.condition.wait_for(self.concurrency.try_acquire)
+
+        sample = Sample()
+        start = time.monotonic()
+        try:
+            yield sample
+        finally:
+            self.concurrency.release(time.monotonic() - start, sample.status)
+            with self.condition:
+                self.condition.notify_all()
+
+
+class AsyncLimiter:
+    def __init__(
+            self,
+            rate: Optional[RateLimiter] = None,
+            concurrency: Optional[AdaptiveConcurrency] = None
+    ):
+        self.rate = rate
+        self.concurrency = concurrency
+        self.condition = None
+
+    @asynccontextmanager
+    async def request(self, path: str):
+        import asyncio
+
+        if self.rate is not None:
+            delay = self.rate.reserve(path)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        if self.concurrency is None:
+            yield Sample()
+            return
+
+        if self.condition is None:
+            self.condition = asyncio.Condition()
+
+        async with self.condition:
+            await self.condition.wait_for(self.concurrency.try_acquire)
+
+        sample = Sample()
+        start = time.monotonic()
+        try:
+            yield sample
+        finally:
+            self.concurrency.release(time.monotonic() - start, sample.status)
+            async with self.condition:
+                self.condition.notify_all()
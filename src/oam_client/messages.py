@@ -1,23 +1,22 @@
+from __future__ import annotations
 import json
 import os
 import logging
-from datetime import datetime
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional
-from httpx_sse import ServerSentEvent
-from asset_model import (
-    OAMObject,
-    Asset,
-    AssetType,
-    Relation,
-    RelationType,
-    Property,
-    PropertyType,
-    get_asset_by_type,
-    get_relation_by_type,
-    get_property_by_type
-)
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from datetime import datetime
+    from .sse import ServerSentEvent
+    from asset_model import (
+        Asset,
+        AssetType,
+        Relation,
+        RelationType,
+        Property,
+        PropertyType,
+    )
 
 LOGLEVEL = os.getenv("LOGLEVEL", "WARNING").upper()
 
@@ -27,6 +26,14 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def loads(json_data: str | bytes) -> dict:
+    # Event streams are always UTF-8: decoding directly is cheaper than
+    # letting json.loads sniff the encoding of every payload.
+    if isinstance(json_data, bytes):
+        json_data = json_data.decode("utf-8")
+    return json.loads(json_data)
+
+
 class ServerAction(str, Enum):
     EntityCreated    = "EntityCreated"
     EntityUpdated    = "EntityUpdated"
@@ -64,17 +71,21 @@ class Entity:
         })
 
     @staticmethod
-    def from_json(json_data: str) -> "Entity":
+    def from_json(json_data: str | bytes) -> "Entity":
         logger.debug(json_data)
-        data = json.loads(json_data)
-        asset_type = AssetType(data["type"])
+        return Entity.from_dict(json.loads(json_data))
+
+    @staticmethod
+    def from_dict(data: dict) -> "Entity":
+        from .decoders import asset_decoder
+
+        asset_type, decode = asset_decoder(data["type"])
         return Entity(
             id=data["id"],
             created_at=data["created_at"],
             last_seen=data["last_seen"],
             type=asset_type,
-            asset=OAMObject.from_dict(
-                get_asset_by_type(asset_type), data["asset"])
+            asset=decode(data["asset"])
         )
 
 
@@ -100,17 +111,21 @@ class Edge:
         })
 
     @staticmethod
-    def from_json(json_data: str) -> "Edge":
+    def from_json(json_data: str | bytes) -> "Edge":
         logger.debug(json_data)
-        data = json.loads(json_data)
-        rel_type = RelationType(data["type"])
+        return Edge.from_dict(json.loads(json_data))
+
+    @staticmethod
+    def from_dict(data: dict) -> "Edge":
+        from .decoders import relation_decoder
+
+        rel_type, decode = relation_decoder(data["type"])
         return Edge(
             id=data["id"],
             created_at=data["created_at"],
             last_seen=data["last_seen"],
             type=rel_type,
-            relation=OAMObject.from_dict(
-                get_relation_by_type(rel_type), data["relation"]),
+            relation=decode(data["relation"]),
             from_entity=data["from_entity"],
             to_entity=data["to_entity"],
         )
@@ -136,17 +151,21 @@ class EntityTag:
         })
 
     @staticmethod
-    def from_json(json_data: str) -> "EntityTag":
+    def from_json(json_data: str | bytes) -> "EntityTag":
         logger.debug(json_data)
-        data = json.loads(json_data)
-        prop_type = PropertyType(data["type"])
+        return EntityTag.from_dict(json.loads(json_data))
+
+    @staticmethod
+    def from_dict(data: dict) -> "EntityTag":
+        from .decoders import property_decoder
+
+        prop_type, decode = property_decoder(data["type"])
         return EntityTag(
             id=data["id"],
             created_at=data["created_at"],
             last_seen=data["last_seen"],
             type=prop_type,
-            property=OAMObject.from_dict(
-                get_property_by_type(prop_type), data["property"]),
+            property=decode(data["property"]),
             entity=data["entity"]
         )
 
@@ -171,17 +190,21 @@ class EdgeTag:
         })
 
     @staticmethod
-    def from_json(json_data: str) -> "EdgeTag":
+    def from_json(json_data: str | bytes) -> "EdgeTag":
         logger.debug(json_data)
-        data = json.loads(json_data)
-        prop_type = PropertyType(data["type"])
+        return EdgeTag.from_dict(json.loads(json_data))
+
+    @staticmethod
+    def from_dict(data: dict) -> "EdgeTag":
+        from .decoders import property_decoder
+
+        prop_type, decode = property_decoder(data["type"])
         return EdgeTag(
             id=data["id"],
             created_at=data["created_at"],
             last_seen=data["last_seen"],
             type=prop_type,
-            property=OAMObject.from_dict(
-                get_property_by_type(prop_type), data["property"]),
+            property=decode(data["property"]),
             edge=data["edge"]
         )
 
@@ -193,34 +216,34 @@ class Event:
 
     @staticmethod
     def from_sse(sse: ServerSentEvent) -> "Event":
-        try:
-            action = ServerAction(sse.event)
-        except ValueError as e:
-            raise e
+        return Event.from_json(sse.event, sse.data)
 
+    @staticmethod
+    def from_json(event: str, json_data: str | bytes) -> "Event":
+        logger.debug(json_data)
+        return Event.from_dict(event, loads(json_data))
+
+    @staticmethod
+    def from_dict(event: str, data: dict) -> "Event":
         try:
-            match action:
-                case ServerAction.EntityCreated \
-                   | ServerAction.EntityUpdated \
-                   | ServerAction.EntityTouched \
-                   | ServerAction.EntityDeleted:
-                    data = Entity.from_json(sse.data)
-                case ServerAction.EdgeCreated \
-                   | ServerAction.EdgeUpdated \
-                   | ServerAction.EdgeTouched \
-                   | ServerAction.EdgeDeleted:
-                    data = Edge.from_json(sse.data)
-                case ServerAction.EntityTagCreated \
-                   | ServerAction.EntityTagUpdated \
-                   | ServerAction.EntityTagTouched \
-                   | ServerAction.EntityTagDeleted:
-                    data = EntityTag.from_json(sse.data)
-                case ServerAction.EdgeTagCreated \
-                   | ServerAction.EdgeTagUpdated \
-                   | ServerAction.EdgeTagTouched \
-                   | ServerAction.EdgeTagDeleted:
-                    data = EdgeTag.from_json(sse.data)
-        except Exception as e:
-            raise e
-
-        return Event(action, data)
+            action, message = EVENT_MESSAGES[event]
+        except KeyError:
+            raise ValueError(
+                f"{event!r} is not a valid {ServerAction.__qualname__}")
+
+        return Event(action, message.from_dict(data))
+
+
+EVENT_MESSAGES: dict[str, tuple[ServerAction, type]] = {
+    action.value: (action, message)
+    for name, message in (
+            ("Entity", Entity),
+            ("Edge", Edge),
+            ("EntityTag", EntityTag),
+            ("EdgeTag", EdgeTag))
+    for action in (
+            ServerAction(name + "Created"),
+            ServerAction(name + "Updated"),
+            ServerAction(name + "Deleted"),
+            ServerAction(name + "Touched"))
+}
@@ -0,0 +1,251 @@
+import asyncio
+import inspect
+import mmap
+import os
+import struct
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, BinaryIO, Callable, Iterator, Optional
+import httpx
+from .base import BrokerClientBase
+from .sse import SSEParser, ServerSentEvent
+
+# File layout: MAGIC, then one record per event:
+#   <u64 arrival offset in ns><u8 name code><u16 id length><u32 data length>
+# followed by the id and data bytes. A record with code NEW_NAME carries
+# an event name as its data and assigns it the next code, so each name is
+# stored once.
+MAGIC = b"OAMSSE1\n"
+RECORD = struct.Struct("<QBHI")
+NEW_NAME = 0xFF
+
+CHUNK = 16 * 1024
+
+
+@dataclass(slots=True)
+class RecordedEvent:
+    offset_ns: int
+    event: str
+    id: str
+    data: bytes
+
+    def encode(self) -> bytes:
+        # The layout the broker emits, one data line per payload line.
+        head = f"event: {self.event}\n"
+        if self.id:
+            head += f"id: {self.id}\n"
+        return head.encode("utf-8") \
+            + b"".join(b"data: " + line + b"\n"
+                       for line in self.data.split(b"\n")) \
+            + b"\n"
+
+
+class Recorder:
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        self.names: dict[str, int] = {}
+        self.count = 0
+        self.file.write(MAGIC)
+
+    def write(self, offset_ns: int, sse: ServerSentEvent):
+        code = self.names.get(sse.event)
+        if code is None:
+            if len(self.names) == NEW_NAME:
+                raise ValueError("too many distinct event names to record")
+            code = self.names[sse.event] = len(self.names)
+            name = sse.event.encode("utf-8")
+            self.file.write(RECORD.pack(offset_ns, NEW_NAME, 0, len(name)))
+            self.file.write(name)
+        # Only the event's own id: the parser fills in the last seen id for
+        # events without one, which the broker never sent.
+        ident = sse.id.encode("utf-8") if sse.has_id else b""
+        self.file.write(RECORD.pack(
+            offset_ns, code, len(ident), len(sse.data)))
+        self.file.write(ident)
+        self.file.write(sse.data)
+        self.count += 1
+
+
+def read_recording(path: str) -> Iterator[RecordedEvent]:
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < len(MAGIC):
+            raise ValueError(f"{path} is not an event recording")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            if m[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not an event recording")
+            names: list[str] = []
+            pos = len(MAGIC)
+            size = len(m)
+            while pos + RECORD.size <= size:
+                offset_ns, code, id_length, data_length = \
+                    RECORD.unpack_from(m, pos)
+                pos += RECORD.size
+                end = pos + id_length + data_length
+                if end > size:
+                    break  # truncated by an interrupted recording
+                if code == NEW_NAME:
+                    names.append(m[pos:end].decode("utf-8"))
+                    pos = end
+                    continue
+                yield RecordedEvent(
+                    offset_ns, names[code],
+                    m[pos:pos + id_length].decode("utf-8"),
+                    m[pos + id_length:end])
+                pos = end
+
+
+def record(
+        client: BrokerClientBase,
+        path: str,
+        limit: Optional[int] = None,
+        duration: Optional[float] = None
+) -> int:
+    # Events are timestamped when their chunk arrives. The duration is
+    # checked between chunks and also bounds each read, so a quiet stream
+    # stops at most one duration late.
+    with open(path, "wb") as f, httpx.Client(
+            http2=True,
+            verify=client.ssl_context,
+            timeout=httpx.Timeout(None, connect=10.0, read=duration),
+            transport=client.transport
+    ) as http:
+        recorder = Recorder(f)
+        with http.stream(
+                "GET",
+                client.url + "/listen",
+                headers=client._listen_headers()
+        ) as response:
+            response.raise_for_status()
+            parser = SSEParser()
+            start = time.perf_counter_ns()
+            try:
+                for chunk in response.iter_bytes():
+                    now = time.perf_counter_ns() - start
+                    for sse in parser.feed(chunk):
+                        recorder.write(now, sse)
+                        if recorder.count == limit:
+                            return recorder.count
+                    f.flush()
+                    if duration is not None and now >= duration * 1e9:
+                        break
+            except httpx.ReadTimeout:
+                pass  # nothing arrived before the duration ran out
+        return recorder.count
+
+
+class ReplayStream(httpx.SyncByteStream, httpx.AsyncByteStream):
+    def __init__(self, transport: "ReplayTransport"):
+        self.transport = transport
+
+    def chunks(self) -> Iterator[tuple[float, list[bytes]]]:
+        # Yields (due time, encoded events); events due at the same time
+        # are sent as one chunk, as they would arrive from the network.
+        speed = self.transport.speed
+        start = time.perf_counter()
+        pending: list[bytes] = []
+        size = 0
+        due = start
+        for event in self.transport.events:
+            at = start if not speed else start + event.offset_ns / 1e9 / speed
+            if pending and (at > due or size >= CHUNK):
+                yield due, pending
+                pending, size = [], 0
+            if not pending:
+                due = at
+            encoded = event.encode()
+            pending.append(encoded)
+            size += len(encoded)
+        if pending:
+            yield due, pending
+
+    def __iter__(self) -> Iterator[bytes]:
+        sent = self.transport.sent
+        for due, events in self.chunks():
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            now = time.perf_counter()
+            sent.extend([now] * len(events))
+            yield b"".join(events)
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        sent = self.transport.sent
+        for due, events in self.chunks():
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            now = time.perf_counter()
+            sent.extend([now] * len(events))
+            yield b"".join(events)
+
+
+class ReplayTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    def __init__(
+            self,
+            events: list[RecordedEvent],
+            speed: Optional[float] = 1.0,
+            repeat: int = 1
+    ):
+        # speed 1.0 replays at the recorded pace, 2.0 twice as fast and
+        # None (or 0) as fast as the consumer reads.
+        self.events = events
+        self.speed = speed
+        self.remaining = repeat
+        self.sent: list[float] = []
+        self.done: list[float] = []
+
+    @classmethod
+    def from_file(
+            cls,
+            path: str,
+            speed: Optional[float] = 1.0,
+            repeat: int = 1
+    ) -> "ReplayTransport":
+        return cls(list(read_recording(path)), speed, repeat)
+
+    def response(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path != "/listen":
+            return httpx.Response(404, request=request)
+        if self.remaining <= 0:
+            return httpx.Response(204, request=request)
+        self.remaining -= 1
+        return httpx.Response(
+            200,
+            headers={"Content-Type": "text/event-stream"},
+            stream=ReplayStream(self),
+            request=request)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self.response(request)
+
+    async def handle_async_request(
+            self,
+            request: httpx.Request
+    ) -> httpx.Response:
+        return self.response(request)
+
+    def close(self):
+        pass
+
+    async def aclose(self):
+        pass
+
+    def measure(self, handler: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        # Wraps a listen_events handler to record when each event has been
+        # handled; events are numbered on entry so concurrent async
+        # handlers finishing out of order still pair with their send time.
+        done = self.done
+        if inspect.iscoroutinefunction(handler):
+            async def measured(event):
+                index = len(done)
+                done.append(0.0)
+                await handler(event)
+                done[index] = time.perf_counter()
+        else:
+            def measured(event):
+                handler(event)
+                done.append(time.perf_counter())
+        return measured
+
+    def latencies(self) -> list[float]:
+        return [done - sent for sent, done in zip(self.sent, self.done)]
@@ -0,0 +1,138 @@
+import re
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+DEFAULT_EVENT = "message"
+
+# The layout the broker emits: [event: <name>\n][id: <id>\n]data: <json>\n\n
+BROKER_EVENT = re.compile(
+    rb"(?:event: ([^\n]*)\n)?(?:id: ([^\n\0]*)\n)?data: ([^\n]*)\n\n")
+
+
+@dataclass(slots=True)
+class ServerSentEvent:
+    event: str
+    data: bytes
+    id: str = ""
+    retry: Optional[int] = None
+    # Whether the event carried its own id line; id otherwise holds the
+    # last event id seen on the stream, as the spec requires.
+    has_id: bool = False
+
+
+class SSEParser:
+    def __init__(self):
+        self.pending: list[bytes] = []
+        self.trailing_cr = False
+        self.last_event_id = ""
+        self.retry: Optional[int] = None
+        self.names: dict[bytes, str] = {}
+
+    def feed(self, chunk: bytes) -> Iterator[ServerSentEvent]:
+        # Events are matched directly on the raw bytes; the only copies
+        # made are the field values, and the data slice goes straight to
+        # the JSON decoder.
+        if self.trailing_cr:
+            self.trailing_cr = False
+            if chunk.startswith(b"\n"):
+                chunk = chunk[1:]
+        if b"\r" in chunk:
+            # A trailing CR ends the line now; a LF opening the next chunk
+            # belongs to the same CRLF and is skipped.
+            self.trailing_cr = chunk.endswith(b"\r")
+            chunk = chunk.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+        if self.pending:
+            self.pending.append(chunk)
+            if b"\n\n" not in chunk and not chunk.startswith(b"\n"):
+                return
+            buf = b"".join(self.pending)
+            self.pending = []
+        else:
+            buf = chunk
+
+        match = BROKER_EVENT.match
+        names = self.names
+        pos = 0
+        while True:
+            if m := match(buf, pos):
+                name, ident, data = m.groups()
+                pos = m.end()
+                if ident is not None:
+                    self.last_event_id = ident.decode("utf-8")
+                yield ServerSentEvent(
+                    DEFAULT_EVENT if name is None
+                    else names.get(name) or self.name(name),
+                    data, self.last_event_id, self.retry, ident is not None)
+                continue
+
+            end = buf.find(b"\n\n", pos)
+            if end == -1:
+                break
+            sse = self.parse_block(buf, pos, end)
+            pos = end + 2
+            if sse is not None:
+                yield sse
+
+        if pos < len(buf):
+            self.pending.append(buf[pos:])
+
+    def parse_block(
+            self,
+            buf: bytes,
+            start: int,
+            end: int
+    ) -> Optional[ServerSentEvent]:
+        event = None
+        data = []
+        has_id = False
+        while start <= end:
+            nl = buf.find(b"\n", start, end)
+            if nl == -1:
+                nl = end
+            if nl == start:
+                # Blank line inside the block: it ends an event of its own.
+                start = nl + 1
+                if data:
+                    break
+                event = None
+                has_id = False
+                continue
+
+            if buf[start] != 0x3A:  # ":" starts a comment line
+                colon = buf.find(b":", start, nl)
+                if colon == -1:
+                    colon = value = nl
+                else:
+                    value = colon + 1
+                    if value < nl and buf[value] == 0x20:
+                        value += 1
+
+                match buf[start:colon]:
+                    case b"data":
+                        data.append(buf[value:nl])
+                    case b"event":
+                        event = self.name(buf[value:nl])
+                    case b"id":
+                        ident = buf[value:nl]
+                        if b"\0" not in ident:
+                            self.last_event_id = ident.decode("utf-8")
+                            has_id = True
+                    case b"retry":
+                        retry = buf[value:nl]
+                        if retry.isdigit():
+                            self.retry = int(retry)
+            start = nl + 1
+
+        if not data:
+            return None
+        return ServerSentEvent(
+            event or DEFAULT_EVENT,
+            data[0] if len(data) == 1 else b"\n".join(data),
+            self.last_event_id,
+            self.retry,
+            has_id)
+
+    def name(self, name: bytes) -> str:
+        return self.names.get(name) \
+            or self.names.setdefault(name, name.decode("utf-8"))
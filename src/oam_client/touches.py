@@ -0,0 +1,81 @@
+import time
+from typing import Callable, Optional
+from .messages import Event, ServerAction, EVENT_MESSAGES, loads
+
+TOUCHED = frozenset({
+    ServerAction.EntityTouched,
+    ServerAction.EdgeTouched,
+    ServerAction.EntityTagTouched,
+    ServerAction.EdgeTagTouched,
+})
+
+
+class TouchCollapser:
+    def __init__(
+            self,
+            window: float,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        self.window = window
+        self.clock = clock
+        self.pending: dict[tuple[type, str], tuple[str, dict]] = {}
+        self.deadline: Optional[float] = None
+        self.collapsed = 0
+
+    def push(self, event: str, json_data: str | bytes) -> list[Event]:
+        # Touched events are held per (kind, id) and only the latest one
+        # survives the window; any other event for the same id first
+        # releases the held Touched so per-id ordering is preserved.
+        ready = self.expire()
+        data = loads(json_data)
+
+        if event in TOUCHED:
+            key = (EVENT_MESSAGES[event][1], data["id"])
+            if key in self.pending:
+                self.collapsed += 1
+            elif not self.pending:
+                self.deadline = self.clock() + self.window
+            self.pending[key] = (event, data)
+            return ready
+
+        decoded = Event.from_dict(event, data)
+        touched = self.pending.pop((type(decoded.data), data["id"]), None)
+        if touched is not None:
+            ready.append(Event.from_dict(*touched))
+        ready.append(decoded)
+        return ready
+
+    def remaining(self) -> float:
+        # Seconds until the held events are due, at most one window.
+        if self.deadline is None:
+            return self.window
+        return max(0.0, min(self.window, self.deadline - self.clock()))
+
+    def expire(self) -> list[Event]:
+        if self.deadline is None or self.clock() < self.deadline:
+            return []
+        return self.flush()
+
+    def flush(self) -> list[Event]:
+        # Every held event is decoded before any is released: a bad payload
+        # is dropped and raises, leaving the others held for the next flush.
+        ready = []
+        for key, (event, data) in list(self.pending.items()):
+            try:
+                ready.append(Event.from_dict(event, data))
+            except Exception:
+                del self.pending[key]
+                raise
+        self.pending = {}
+        self.deadline = None
+        return ready
+
+    def drain(self) -> tuple[list[Event], list[Exception]]:
+        # Releases everything still held when the listener stops, with the
+        # errors of the payloads that could not be decoded.
+        errors = []
+        while True:
+            try:
+                return self.flush(), errors
+            except Exception as e:
+                errors.append(e)
@@ -0,0 +1,218 @@
+import asyncio
+import io
+import pytest
+from types import SimpleNamespace
+from oam_client.bulk import Checkpoint, Importer, read_records
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = []
+
+    async def create_entity(self, asset):
+        self.calls.append(("entity", asset.name))
+        return SimpleNamespace(id=f"e{len(self.calls)}")
+
+    async def create_edge(self, relation, from_entity, to_entity):
+        self.calls.append(("edge", from_entity, to_entity))
+        return SimpleNamespace(id=f"r{len(self.calls)}")
+
+    async def create_entity_tag(self, prop, entity):
+        self.calls.append(("entity_tag", entity))
+        return SimpleNamespace(id=f"t{len(self.calls)}")
+
+    async def create_edge_tag(self, prop, edge):
+        self.calls.append(("edge_tag", edge))
+        return SimpleNamespace(id=f"t{len(self.calls)}")
+
+
+NDJSON = (
+    '{"ref": "a", "type": "FQDN", "asset": {"name": "a.org"}}\n'
+    '\n'
+    '{"ref": "b", "type": "FQDN", "asset": {"name": "b.org"}}\n'
+    '{"ref": "ab", "type": "SimpleRelation", "relation": {"label": "node"}, '
+    '"from_entity": "a", "to_entity": "b"}\n'
+    '{"type": "SourceProperty", "property": {"name": "dns", "confidence": 100}, '
+    '"entity": "b"}\n'
+    '{"type": "SourceProperty", "property": {"name": "dns", "confidence": 100}, '
+    '"edge": "ab"}\n'
+)
+
+CSV = (
+    "ref,type,name,confidence,from_entity,to_entity,entity,label\n"
+    "a,FQDN,a.org,,,,,\n"
+    "ab,SimpleRelation,,,a,existing,,node\n"
+    ",SourceProperty,dns,100,,,a,\n"
+)
+
+
+def test_read_csv(tmp_path):
+    path = tmp_path / "input.csv"
+    path.write_text(CSV)
+
+    records = list(read_records(str(path)))
+    assert [r.data for r in records] == [
+        {"ref": "a", "type": "FQDN", "asset": {"name": "a.org"}},
+        {"ref": "ab", "type": "SimpleRelation", "from_entity": "a",
+         "to_entity": "existing", "relation": {"label": "node"}},
+        {"type": "SourceProperty", "entity": "a",
+         "property": {"name": "dns", "confidence": 100}},
+    ]
+    resumed = read_records(str(path), offset=records[1].offset)
+    assert [r.data.get("ref") for r in resumed] == ["ab", None]
+
+
+@pytest.mark.asyncio
+async def test_import_resolves_references(tmp_path):
+    path = tmp_path / "input.ndjson"
+    path.write_text(NDJSON)
+    client = FakeClient()
+    checkpoint = Checkpoint(str(tmp_path / "input.checkpoint"))
+
+    importer = Importer(client, batch_size=3, checkpoint=checkpoint,
+                        report=io.StringIO())
+    stats = await importer.run(read_records(str(path)))
+    checkpoint.close()
+
+    assert (stats.records, stats.created, stats.failed) == (5, 5, 0)
+    edge = next(call for call in client.calls if call[0] == "edge")
+    assert edge[1:] == (importer.refs["a"], importer.refs["b"])
+    assert ("entity_tag", importer.refs["b"]) in client.calls
+    assert ("edge_tag", importer.refs["ab"]) in client.calls
+
+    resumed = Checkpoint(checkpoint.path)
+    resumed.load()
+    assert resumed.offset == len(NDJSON)
+    assert resumed.refs == importer.refs
+
+
+@pytest.mark.asyncio
+async def test_import_resume_skips_done_batches(tmp_path):
+    path = tmp_path / "input.ndjson"
+    path.write_text(NDJSON)
+    checkpoint = Checkpoint(str(tmp_path / "input.checkpoint"))
+
+    await Importer(FakeClient(), batch_size=2, checkpoint=checkpoint,
+                   report=io.StringIO()).run(
+        r for r in read_records(str(path)) if r.data.get("ref") != "ab")
+    checkpoint.close()
+    # Simulate an interruption after the first batch.
+    with open(checkpoint.path) as f:
+        first = f.readline()
+    with open(checkpoint.path, "w") as f:
+        f.write(first + '{"offset": ')
+
+    resumed = Checkpoint(checkpoint.path)
+    resumed.load()
+    client = FakeClient()
+    await Importer(client, checkpoint=resumed, report=io.StringIO()).run(
+        read_records(str(path), offset=resumed.offset))
+    resumed.close()
+
+    assert client.calls[0] == ("edge", resumed.refs["a"], resumed.refs["b"])
+
+    # A second resume sees every entry written after the torn line.
+    again = Checkpoint(checkpoint.path)
+    again.load()
+    assert again.offset == len(NDJSON)
+    assert again.refs == resumed.refs
+    client = FakeClient()
+    await Importer(client, checkpoint=again, report=io.StringIO()).run(
+        read_records(str(path), offset=again.offset))
+    again.close()
+    assert client.calls == []
+
+
+@pytest.mark.asyncio
+async def test_import_failure_propagates_to_dependents(tmp_path):
+    path = tmp_path / "input.ndjson"
+    path.write_text(
+        '{"ref": "a", "type": "NoSuchAsset", "asset": {}}\n'
+        '{"type": "SourceProperty", "property": {"name": "dns", "confidence": 1}, '
+        '"entity": "a"}\n')
+
+    client = FakeClient()
+    stats = await Importer(client, report=io.StringIO()).run(
+        read_records(str(path)))
+    assert (stats.created, stats.failed) == (0, 2)
+    assert client.calls == []
+
+
+def test_csv_cells_follow_model_types(tmp_path):
+    path = tmp_path / "input.csv"
+    path.write_text(
+        "ref,type,name,confidence,entity,is_ca,key_usage\n"
+        "a,FQDN,12345,,,,\n"
+        ",SourceProperty,true,100,a,,\n"
+        ",SourceProperty,dns,high,a,,\n"
+        "c,TLSCertificate,,,,yes,[]\n")
+
+    records = list(read_records(str(path)))
+    assert records[0].data["asset"] == {"name": "12345"}
+    assert records[1].data["property"] == {"name": "true", "confidence": 100}
+    assert isinstance(records[2].error, ValueError)
+    assert records[3].data["asset"] == {"is_ca": True, "key_usage": []}
+
+
+@pytest.mark.asyncio
+async def test_import_failed_reference_in_earlier_batch(tmp_path):
+    path = tmp_path / "input.ndjson"
+    path.write_text(
+        '{"ref": "a", "type": "NoSuchAsset", "asset": {}}\n'
+        '{"type": "SourceProperty", "property": {"name": "dns", "confidence": 1}, '
+        '"entity": "a"}\n')
+
+    client = FakeClient()
+    stats = await Importer(client, batch_size=1, report=io.StringIO()).run(
+        read_records(str(path)))
+    assert (stats.created, stats.failed) == (0, 2)
+    assert client.calls == []
+
+
+@pytest.mark.asyncio
+async def test_import_rejects_self_references(tmp_path):
+    path = tmp_path / "input.ndjson"
+    path.write_text(
+        '{"ref": "x", "type": "SimpleRelation", "relation": {"label": "node"}, '
+        '"from_entity": "x", "to_entity": "y"}\n'
+        '{"ref": "t", "type": "SourceProperty", "property": {"name": "dns", '
+        '"confidence": 1}, "edge": "t"}\n'
+        '{"ref": "u", "type": "SourceProperty", "property": {"name": "dns", '
+        '"confidence": 1}, "entity": "x"}\n')
+
+    stats = await asyncio.wait_for(
+        Importer(FakeClient(), report=io.StringIO()).run(
+            read_records(str(path))), 5)
+    assert (stats.created, stats.failed) == (0, 3)
+
+
+@pytest.mark.asyncio
+async def test_import_retries_failed_records_on_resume(tmp_path):
+    path = tmp_path / "input.ndjson"
+    path.write_text(
+        '{"ref": "a", "type": "FQDN", "asset": {"name": "a.org"}}\n'
+        '{"ref": "b", "type": "FQDX", "asset": {"name": "b"}}\n'
+        '{"type": "SourceProperty", "property": {"name": "dns", "confidence": 1}, '
+        '"entity": "a"}\n')
+    checkpoint = Checkpoint(str(tmp_path / "input.checkpoint"))
+    stats = await Importer(FakeClient(), checkpoint=checkpoint,
+                           report=io.StringIO()).run(read_records(str(path)))
+    checkpoint.close()
+    assert (stats.created, stats.failed) == (2, 1)
+
+    # Fix the broken line in place and resume.
+    text = path.read_text().replace("FQDX", "FQDN")
+    path.write_text(text)
+    resumed = Checkpoint(checkpoint.path)
+    resumed.load()
+    assert resumed.offset == len(text) and len(resumed.failed) == 1
+
+    client = FakeClient()
+    await Importer(client, checkpoint=resumed, report=io.StringIO()).run(
+        read_records(str(path), offset=resumed.offset, retry=resumed.failed))
+    resumed.close()
+    assert client.calls == [("entity", "b")]
+
+    done = Checkpoint(checkpoint.path)
+    done.load()
+    assert done.failed == set() and "b" in done.refs
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import time
+import pytest
+from oam_client.coalescing import PendingWrites, WriteCoalescer, AsyncWriteCoalescer
+
+
+def test_pending_writes_merge():
+    pending = PendingWrites()
+    pending.add("put", "/emit/entity/1", "a", None)
+    pending.add("put", "/emit/entity/1", "b", None)
+    pending.add("put", "/emit/entity/2", "c", None)
+    pending.add("delete", "/emit/entity/2", "", None)
+    pending.add("delete", "/emit/entity/2", "", None)
+    pending.add("put", "/emit/entity/2", "d", None)
+
+    writes = pending.take()
+    assert [(w.method, w.payload) for w in writes["/emit/entity/1"]] \
+        == [("put", "b")]
+    assert [(w.method, w.payload) for w in writes["/emit/entity/2"]] \
+        == [("delete", ""), ("put", "d")]
+    assert pending.stats.submitted == 6
+    assert pending.stats.sent == 3
+    assert pending.stats.saved == 3
+    assert pending.take() == {}
+
+
+@pytest.mark.asyncio
+async def test_async_coalescer():
+    sent = []
+
+    async def send(method, path, payload):
+        sent.append((method, path, payload))
+        return payload
+
+    coalescer = AsyncWriteCoalescer(0.01, send)
+    results = await asyncio.gather(
+        coalescer.submit("put", "/emit/edge/1", "a"),
+        coalescer.submit("put", "/emit/edge/1", "b"),
+        coalescer.submit("put", "/emit/edge/2", "c"),
+        coalescer.submit("delete", "/emit/edge/2", ""))
+
+    assert results == ["b", "b", "", ""]
+    assert sorted(sent) == [
+        ("delete", "/emit/edge/2", ""), ("put", "/emit/edge/1", "b")]
+    assert coalescer.stats.saved == 2
+
+
+def test_sync_coalescer():
+    sent = []
+
+    def send(method, path, payload):
+        sent.append((method, path, payload))
+        return payload
+
+    coalescer = WriteCoalescer(0.05, send)
+    results = []
+    threads = [
+        threading.Thread(target=lambda p=p: results.append(
+            coalescer.submit("put", "/emit/entity_tag/1", p)))
+        for p in ("a", "b", "c")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(sent) == 1
+    assert results == [sent[0][2]] * 3
+    assert coalescer.stats.saved == 2
+
+
+def test_sync_coalescer_sends_paths_in_parallel():
+    def send(method, path, payload):
+        time.sleep(0.1)
+        return payload
+
+    coalescer = WriteCoalescer(0.01, send)
+    results = []
+    threads = [
+        threading.Thread(target=lambda i=i: results.append(
+            coalescer.submit("put", f"/emit/entity/{i}", str(i))))
+        for i in range(4)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(results) == ["0", "1", "2", "3"]
+    assert time.perf_counter() - start < 0.3
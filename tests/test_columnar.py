@@ -0,0 +1,99 @@
+import pytest
+from asset_model import (
+    AssetType,
+    FQDN,
+    IPAddress,
+    BasicDNSRelation,
+    RRHeader,
+    SourceProperty,
+)
+from oam_client.messages import Entity, Edge, EntityTag, Event, ServerAction
+from oam_client.columnar import (
+    EventBatch,
+    BatchCollector,
+    batches,
+    timestamp_ns,
+    NAT,
+    TYPES,
+    TYPE_CODES,
+)
+
+
+def events():
+    relation = BasicDNSRelation("dns_record", RRHeader(1))
+    prop = SourceProperty("dns", 90)
+    return [
+        Event(ServerAction.EntityCreated, Entity(
+            AssetType.FQDN, FQDN(name="a.org"), id="e1",
+            created_at="1970-01-01T00:00:01Z",
+            last_seen="1970-01-01T00:00:02.5Z")),
+        Event(ServerAction.EntityTouched, Entity(
+            AssetType.IPAddress, IPAddress(address="10.0.0.1", type="IPv4"),
+            id="e2")),
+        Event(ServerAction.EdgeCreated, Edge(
+            relation.relation_type, relation, "e1", "e2", id="r1")),
+        Event(ServerAction.EntityTagCreated, EntityTag(
+            prop.property_type, prop, "e1", id="t1")),
+    ]
+
+
+def test_timestamp_ns():
+    assert timestamp_ns(None) == NAT
+    assert timestamp_ns("1970-01-01T00:00:01.000002Z") == 1_000_002_000
+    assert timestamp_ns("1970-01-01T01:00:00+01:00") == 0
+
+
+def test_numpy_columns():
+    np = pytest.importorskip("numpy")
+    batch = EventBatch(attributes=("name", "address"))
+    batch.extend(events())
+    columns = batch.to_numpy()
+
+    assert len(batch) == 4
+    assert columns["action"].dtype == np.uint8
+    assert list(columns["id"]) == ["e1", "e2", "r1", "t1"]
+    assert list(columns["created_at"][:2]) == [1_000_000_000, NAT]
+    assert columns["last_seen"][0] == 2_500_000_000
+    assert list(columns["from_entity"]) == [None, None, "e1", None]
+    assert list(columns["subject"]) == [None, None, None, "e1"]
+    assert list(columns["name"]) == ["a.org", None, None, "dns"]
+    assert columns["address"][1] == "10.0.0.1"
+
+    types = batch.type_names()
+    assert types[columns["type"][1]] == "IPAddress"
+    entities = columns["action"] <= 3
+    assert entities.sum() == 2
+
+
+def test_arrow_record_batch():
+    pytest.importorskip("pyarrow")
+    batch = EventBatch(attributes=("name",))
+    batch.extend(events())
+    record = batch.to_arrow()
+
+    assert record.num_rows == 4
+    assert record.column("action").to_pylist()[2] == "EdgeCreated"
+    assert record.column("type").to_pylist()[0] == "FQDN"
+    assert record.column("created_at").null_count == 3
+    assert record.column("to_entity").to_pylist()[2] == "e2"
+
+
+def test_batching():
+    assert [len(b) for b in batches(events() * 3, size=5)] == [5, 5, 2]
+
+    received = []
+    collector = BatchCollector(received.append, size=3)
+    for event in events():
+        collector(event)
+    assert [len(b) for b in received] == [3]
+    collector.flush()
+    assert [len(b) for b in received] == [3, 1]
+
+
+def test_type_codes_shared_across_batches():
+    # IPAddress opens the first batch and FQDN the second; both keep the
+    # same codes in each.
+    first, second = batches(events()[1:] + events()[:1] + events(), size=4)
+    assert first.type[0] == second.type[1] == TYPE_CODES["IPAddress"]
+    assert first.type[3] == second.type[0] == TYPE_CODES["FQDN"]
+    assert first.type_names() == second.type_names() == TYPES
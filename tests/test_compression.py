@@ -0,0 +1,82 @@
+import gzip
+import httpx
+import pytest
+from asset_model import FQDN
+from oam_client import BrokerClient
+from oam_client.compression import compress, accept_encoding
+from oam_client.messages import Entity
+
+
+def test_gzip_roundtrip():
+    data = b'{"name": "example.org"}' * 100
+    assert gzip.decompress(compress(data, "gzip")) == data
+
+
+def test_zstd_roundtrip_through_transport():
+    zstandard = pytest.importorskip("zstandard")
+    entity = Entity(FQDN(name="example.org").asset_type,
+                    FQDN(name="example.org"), id="1").to_json()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/listen":
+            if listened:
+                return httpx.Response(204)
+            listened.append(request.headers["Accept-Encoding"])
+            body = f"event: EntityCreated\ndata: {entity}\n\n" * 100
+            return httpx.Response(
+                200, headers={"Content-Encoding": "zstd"},
+                content=compress(body.encode("utf-8"), "zstd"))
+        assert request.headers["Content-Encoding"] == "zstd"
+        sent.append(zstandard.ZstdDecompressor().decompress(
+            request.content, max_output_size=1 << 20))
+        return httpx.Response(
+            200, headers={"Content-Encoding": "zstd"},
+            content=compress(entity.encode("utf-8"), "zstd"))
+
+    listened, sent = [], []
+    client = BrokerClient(
+        "https://broker", compression="zstd", compression_threshold=0,
+        transport=httpx.MockTransport(handler))
+
+    created = client.create_entity(FQDN(name="example.org"))
+    assert created.id == "1"
+    assert b'"example.org"' in sent[0]
+
+    received = []
+    client.listen_events(received.append)
+    assert listened[0].startswith("zstd")
+    assert len(received) == 100
+    assert received[-1].data.asset.name == "example.org"
+
+
+def test_unknown_encoding():
+    with pytest.raises(ValueError):
+        BrokerClient("https://localhost:443", compression="br")
+
+
+def test_payload_threshold():
+    client = BrokerClient(
+        "https://localhost:443",
+        compression="gzip",
+        compression_threshold=64)
+
+    content, headers = client._encode_payload("{}")
+    assert content == b"{}"
+    assert "Content-Encoding" not in headers
+
+    payload = '{"name": "example.org"}' * 10
+    content, headers = client._encode_payload(payload)
+    assert headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(content) == payload.encode("utf-8")
+
+
+def test_compression_refused():
+    client = BrokerClient("https://localhost:443", compression="gzip")
+    assert not client._compression_refused(200)
+    assert client._compression_refused(415)
+    assert client.compression is None
+    assert "Accept-Encoding" not in client._listen_headers()
+
+
+def test_accept_encoding():
+    assert accept_encoding("gzip").startswith("gzip")
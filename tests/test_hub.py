@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import pytest
+from asset_model import AssetType, FQDN, IPAddress, SourceProperty
+from oam_client import BrokerClient, AsyncBrokerClient
+from oam_client.messages import Entity, EntityTag, Event, ServerAction
+
+
+class IdleClient(AsyncBrokerClient):
+    async def listen_events(self, handler):
+        await asyncio.Event().wait()
+
+
+class FailingClient(BrokerClient):
+    def __init__(self, url):
+        super().__init__(url)
+        self.listens = 0
+        self.release = threading.Event()
+
+    def listen_events(self, handler):
+        self.listens += 1
+        self.release.wait()
+        handler(fqdn("a.org"))
+        handler(fqdn("b.org"))
+        raise ValueError("unknown event 'EntityMoved'")
+
+
+class AsyncFailingClient(AsyncBrokerClient):
+    async def listen_events(self, handler):
+        await handler(fqdn("a.org"))
+        raise ValueError("unknown event 'EntityMoved'")
+
+
+def fqdn(name):
+    return Event(
+        ServerAction.EntityCreated,
+        Entity(AssetType.FQDN, FQDN(name=name), id=name))
+
+
+@pytest.mark.asyncio
+async def test_hub_filters():
+    client = IdleClient("https://localhost:443")
+    everything = client.subscribe()
+    fqdns = client.subscribe(types=[AssetType.FQDN])
+    tags = client.subscribe(actions=["EntityTagCreated"])
+
+    tag = Event(
+        ServerAction.EntityTagCreated,
+        EntityTag(SourceProperty("s", 1).property_type,
+                  SourceProperty("s", 1), "a"))
+    ip = Event(
+        ServerAction.EntityUpdated,
+        Entity(AssetType.IPAddress,
+               IPAddress(address="10.0.0.1", type="IPv4")))
+
+    for event in (fqdn("a.org"), tag, ip):
+        await client.hub.dispatch(event)
+
+    assert everything.queue.qsize() == 3
+    assert (await fqdns.get()).data.id == "a.org"
+    assert fqdns.queue.empty()
+    assert await tags.get() is tag
+
+    for subscription in (everything, fqdns, tags):
+        subscription.close()
+    assert client.hub.task is None
+
+
+@pytest.mark.asyncio
+async def test_hub_slow_subscriber_drops_oldest():
+    client = IdleClient("https://localhost:443")
+    slow = client.subscribe(maxsize=2)
+    fast = client.subscribe()
+
+    for i in range(5):
+        await client.hub.dispatch(fqdn(f"{i}.org"))
+
+    assert slow.dropped == 3
+    assert [(await slow.get()).data.id for _ in range(2)] == ["3.org", "4.org"]
+    assert fast.queue.qsize() == 5
+
+    slow.close()
+    fast.close()
+    received = [event async for event in fast]
+    assert len(received) == 5
+
+
+def test_sync_hub_listener_failure():
+    client = FailingClient("https://localhost:443")
+    first = client.subscribe()
+    client.release.set()
+
+    received = []
+    with pytest.raises(ValueError):
+        for event in first:
+            received.append(event.data.id)
+    assert received == ["a.org", "b.org"]
+
+    # A dead listener thread is restarted by the next subscriber.
+    second = client.subscribe(types=[AssetType.FQDN])
+    assert second.get(timeout=5).data.id == "a.org"
+    assert second.get(timeout=5).data.id == "b.org"
+    assert client.listens == 2
+    with pytest.raises(ValueError):
+        second.get(timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_async_hub_listener_failure():
+    client = AsyncFailingClient("https://localhost:443")
+    subscription = client.subscribe()
+
+    assert (await subscription.get()).data.id == "a.org"
+    with pytest.raises(ValueError):
+        await subscription.get()
+
+
+class CancellableClient(AsyncBrokerClient):
+    # Returns normally on cancellation, as the real listener does.
+    def __init__(self, url):
+        super().__init__(url)
+        self.listens = 0
+
+    async def listen_events(self, handler):
+        self.listens += 1
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            return
+
+
+@pytest.mark.asyncio
+async def test_async_hub_close_then_resubscribe():
+    client = CancellableClient("https://localhost:443")
+    first = client.subscribe()
+    await asyncio.sleep(0)
+    first.close()
+    second = client.subscribe()
+    await asyncio.sleep(0.01)
+
+    assert client.hub.subscriptions == [second]
+    assert second.queue.empty()
+    await client.hub.dispatch(fqdn("a.org"))
+    assert (await second.get()).data.id == "a.org"
+    assert client.listens == 2
+    second.close()
@@ -0,0 +1,15 @@
+import subprocess
+import sys
+
+
+def test_import_is_lazy():
+    statement = (
+        "import sys\n"
+        "from oam_client import BrokerClient, AsyncBrokerClient\n"
+        "print(' '.join(m for m in ('httpx', 'h2', "
+        "'asset_model', 'asyncio', 'ssl') if m in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", statement],
+        capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
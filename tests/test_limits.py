@@ -0,0 +1,83 @@
+import asyncio
+import pytest
+from oam_client import AsyncBrokerClient
+from oam_client.limits import (
+    TokenBucket,
+    RateLimiter,
+    AdaptiveConcurrency,
+    AsyncLimiter,
+    endpoint,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket():
+    clock = Clock()
+    bucket = TokenBucket(10, burst=2, clock=clock)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1)
+    assert bucket.reserve() == pytest.approx(0.2)
+    clock.now = 1.0
+    assert bucket.reserve() == 0
+
+
+def test_rate_limiter_per_endpoint():
+    assert endpoint("/emit/entity/42") == "/emit/entity"
+    limiter = RateLimiter(1, burst=1)
+    assert limiter.reserve("/emit/entity") == 0
+    assert limiter.reserve("/emit/edge/1") == 0
+    assert limiter.reserve("/emit/entity/1") > 0
+
+
+def test_adaptive_concurrency():
+    clock = Clock()
+    concurrency = AdaptiveConcurrency(initial=4, maximum=10, clock=clock)
+    for _ in range(100):
+        concurrency.on_sample(0.01, 200)
+    assert concurrency.limit == 10
+
+    clock.now = 1.0
+    concurrency.on_sample(0.01, 503)
+    assert concurrency.limit == 7
+    concurrency.on_sample(0.01, 429)
+    assert concurrency.limit == 7
+
+    clock.now = 2.0
+    concurrency.on_sample(0.5, 200)
+    assert concurrency.limit == 4
+
+
+@pytest.mark.asyncio
+async def test_async_limiter_bounds_inflight():
+    concurrency = AdaptiveConcurrency(initial=2, maximum=2)
+    limiter = AsyncLimiter(concurrency=concurrency)
+    peak = 0
+
+    async def request():
+        nonlocal peak
+        async with limiter.request("/emit/entity") as sample:
+            peak = max(peak, concurrency.inflight)
+            await asyncio.sleep(0.01)
+            sample.status = 200
+
+    await asyncio.gather(*(request() for _ in range(10)))
+    assert peak == 2
+    assert concurrency.inflight == 0
+
+
+def test_client_limiter():
+    client = AsyncBrokerClient(
+        "https://localhost:443",
+        rate_limit=100,
+        concurrency=AdaptiveConcurrency())
+    assert client.limiter.rate.rate == 100
+    assert client.limiter.concurrency.limit == 8
+    assert AsyncBrokerClient("https://localhost:443").limiter is None
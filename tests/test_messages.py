@@ -0,0 +1,57 @@
+import json
+import pytest
+from asset_model import (
+    OAMObject,
+    Account,
+    FQDN,
+    IPAddress,
+    BasicDNSRelation,
+    RRHeader,
+    SourceProperty,
+)
+from oam_client.messages import Entity, Edge, EntityTag, EdgeTag, Event, ServerAction
+
+
+def test_entity_decoder():
+    for asset in (
+            FQDN(name="example.org"),
+            IPAddress(address="10.0.0.1", type="IPv4"),
+            Account(id="1", account_type="user", username="root")):
+        entity = Entity(asset.asset_type, asset, id="1")
+        decoded = Entity.from_json(entity.to_json())
+        assert decoded.asset == OAMObject.from_dict(
+            type(asset), asset.to_dict())
+        assert decoded.type == asset.asset_type
+
+
+def test_edge_decoder_nested():
+    relation = BasicDNSRelation("dns_record", RRHeader(16))
+    edge = Edge(relation.relation_type, relation, "a", "b", id="2")
+    decoded = Edge.from_json(edge.to_json())
+    assert decoded.relation == relation
+    assert isinstance(decoded.relation.header, RRHeader)
+
+
+def test_tag_decoders():
+    prop = SourceProperty("source", 100)
+    tag = EntityTag(prop.property_type, prop, "a", id="3")
+    assert EntityTag.from_json(tag.to_json()).property == prop
+    tag = EdgeTag(prop.property_type, prop, "b", id="4")
+    assert EdgeTag.from_json(tag.to_json()).property == prop
+
+
+def test_event_from_json():
+    prop = SourceProperty("source", 100)
+    tag = EdgeTag(prop.property_type, prop, "b", id="4")
+    event = Event.from_json("EdgeTagTouched", tag.to_json())
+    assert event.action == ServerAction.EdgeTagTouched
+    assert event.data == EdgeTag.from_json(tag.to_json())
+
+
+def test_unknown_types():
+    with pytest.raises(ValueError):
+        Event.from_json("Unknown", "{}")
+    with pytest.raises(ValueError):
+        Entity.from_json(json.dumps({
+            "id": None, "created_at": None, "last_seen": None,
+            "type": "Unknown", "asset": {}}))
@@ -0,0 +1,109 @@
+import time
+import httpx
+import pytest
+from asset_model import AssetType, FQDN
+from oam_client import BrokerClient, AsyncBrokerClient
+from oam_client.messages import Entity, ServerAction
+from oam_client.replay import (
+    RecordedEvent,
+    Recorder,
+    ReplayTransport,
+    read_recording,
+    record,
+)
+from oam_client.sse import ServerSentEvent
+
+
+def events(n: int, interval_ms: int = 0) -> list[RecordedEvent]:
+    actions = (ServerAction.EntityCreated, ServerAction.EntityTouched)
+    return [
+        RecordedEvent(
+            i * interval_ms * 1_000_000,
+            actions[i % 2].value,
+            str(i) if i % 3 else "",
+            Entity(AssetType.FQDN, FQDN(name=f"host{i}.example.org"),
+                   id=str(i)).to_json().encode("utf-8"))
+        for i in range(n)]
+
+
+def test_recording_round_trip(tmp_path):
+    path = tmp_path / "stream.rec"
+    with open(path, "wb") as f:
+        recorder = Recorder(f)
+        for i, event in enumerate(events(5)):
+            recorder.write(i * 1000, ServerSentEvent(
+                event.event, event.data, event.id, has_id=bool(event.id)))
+    size = path.stat().st_size
+    with open(path, "ab") as f:
+        f.write(b"\0" * 5)  # torn record from an interrupted recording
+
+    recorded = list(read_recording(str(path)))
+    assert [(e.offset_ns, e.event, e.data) for e in recorded] == \
+        [(i * 1000, e.event, e.data) for i, e in enumerate(events(5))]
+    assert size < sum(len(e.encode()) for e in recorded)
+
+
+def test_record_from_replay(tmp_path):
+    source = events(20)
+    client = BrokerClient("http://broker",
+                          transport=ReplayTransport(source, speed=None))
+    path = tmp_path / "stream.rec"
+
+    assert record(client, str(path), limit=15) == 15
+    recorded = list(read_recording(str(path)))
+    assert [(e.event, e.data) for e in recorded] == \
+        [(e.event, e.data) for e in source[:15]]
+    assert [e.id for e in recorded] == [e.id for e in source[:15]]
+
+
+def test_record_duration_on_quiet_stream(tmp_path):
+    timeouts = []
+
+    def quiet():
+        yield events(1)[0].encode()
+        # What the network layer raises once the read timeout expires.
+        raise httpx.ReadTimeout("no data")
+
+    def handler(request):
+        timeouts.append(request.extensions["timeout"]["read"])
+        return httpx.Response(200, content=quiet())
+
+    client = BrokerClient("http://broker",
+                          transport=httpx.MockTransport(handler))
+    path = tmp_path / "stream.rec"
+
+    assert record(client, str(path), duration=0.2) == 1
+    assert timeouts == [0.2]
+    assert [e.id for e in read_recording(str(path))] == [""]
+
+
+def test_sync_replay_ends_listen():
+    transport = ReplayTransport(events(100), speed=None, repeat=2)
+    client = BrokerClient("http://broker", transport=transport)
+    received = []
+
+    client.listen_events(transport.measure(received.append))
+
+    assert len(received) == 200
+    assert received[1].action == ServerAction.EntityTouched
+    assert received[99].data.asset.name == "host99.example.org"
+    latencies = transport.latencies()
+    assert len(latencies) == 200 and min(latencies) >= 0
+
+
+@pytest.mark.asyncio
+async def test_async_replay_speed():
+    transport = ReplayTransport(events(11, interval_ms=20), speed=4.0)
+    client = AsyncBrokerClient("http://broker", transport=transport)
+    received = []
+
+    async def handler(event):
+        received.append(event.data.id)
+
+    start = time.perf_counter()
+    await client.listen_events(transport.measure(handler))
+    elapsed = time.perf_counter() - start
+
+    assert received == [str(i) for i in range(11)]
+    assert 0.05 <= elapsed < 0.5
+    assert len(transport.latencies()) == 11
@@ -0,0 +1,42 @@
+import json
+from oam_client.sse import SSEParser
+
+
+def parse(stream: bytes, size: int):
+    parser = SSEParser()
+    events = []
+    for i in range(0, len(stream), size):
+        events.extend(parser.feed(stream[i:i + size]))
+    return events
+
+
+def test_fields_and_chunking():
+    stream = (
+        b": keep-alive\n"
+        b"event: EntityCreated\n"
+        b"id: 1\n"
+        b"data: {\"id\": \"a\",\n"
+        b"data:  \"x\": 1}\n"
+        b"\n"
+        b"retry: 3000\n"
+        b"data\n"
+        b"\n"
+        b"event: ignored\n"
+        b"\n"
+    )
+    for size in (1, 2, 7, len(stream)):
+        events = parse(stream, size)
+        assert [(e.event, e.id, e.retry) for e in events] == [
+            ("EntityCreated", "1", None), ("message", "1", 3000)]
+        assert [e.has_id for e in events] == [True, False]
+        assert json.loads(events[0].data) == {"id": "a", "x": 1}
+        assert events[1].data == b""
+
+
+def test_line_endings():
+    for eol in (b"\r\n", b"\r", b"\n"):
+        stream = eol.join([b"event: EdgeTouched", b"data: {}", b"", b""])
+        for size in (1, 3, len(stream)):
+            events = parse(stream, size)
+            assert [(e.event, e.data) for e in events] == [
+                ("EdgeTouched", b"{}")]
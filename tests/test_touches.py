@@ -0,0 +1,130 @@
+import time
+import pytest
+from asset_model import AssetType, FQDN
+from oam_client import BrokerClient, AsyncBrokerClient
+from oam_client.messages import Entity, ServerAction
+from oam_client.replay import RecordedEvent, ReplayTransport
+from oam_client.touches import TouchCollapser
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def entity(id, last_seen):
+    return Entity(
+        AssetType.FQDN, FQDN(name=f"{id}.org"), id=id,
+        last_seen=last_seen).to_json()
+
+
+def test_touched_collapsed_per_id():
+    clock = Clock()
+    collapser = TouchCollapser(1.0, clock=clock)
+
+    for i in range(3):
+        assert collapser.push("EntityTouched", entity("a", str(i))) == []
+        assert collapser.push("EntityTouched", entity("b", str(i))) == []
+
+    clock.now = 1.0
+    ready = collapser.push("EntityCreated", entity("c", "9"))
+    assert [(e.action, e.data.id, e.data.last_seen) for e in ready] == [
+        (ServerAction.EntityTouched, "a", "2"),
+        (ServerAction.EntityTouched, "b", "2"),
+        (ServerAction.EntityCreated, "c", "9"),
+    ]
+    assert collapser.collapsed == 4
+
+
+def test_other_actions_keep_per_id_order():
+    collapser = TouchCollapser(10.0, clock=Clock())
+    collapser.push("EntityTouched", entity("a", "1"))
+    collapser.push("EntityTouched", entity("b", "1"))
+
+    ready = collapser.push("EntityDeleted", entity("a", "2"))
+    assert [(e.action, e.data.id) for e in ready] == [
+        (ServerAction.EntityTouched, "a"),
+        (ServerAction.EntityDeleted, "a"),
+    ]
+    assert [e.data.id for e in collapser.flush()] == ["b"]
+    assert collapser.flush() == []
+
+
+def touched_replay(ids, gap_ms=0):
+    # Touched events for the given ids, then (optionally) a late Created.
+    events = [
+        RecordedEvent(0, "EntityTouched", "", entity(id, str(i)).encode())
+        for i, id in enumerate(ids)]
+    if gap_ms:
+        events.append(RecordedEvent(
+            gap_ms * 1_000_000, "EntityCreated", "", entity("z", "0").encode()))
+    return events
+
+
+def test_sync_listener_flushes_held_touches_at_end():
+    transport = ReplayTransport(touched_replay("abcabcabc"), speed=None)
+    received = []
+    BrokerClient("http://broker", transport=transport).listen_events(
+        received.append, touch_window=10.0)
+    assert sorted((e.data.id, e.data.last_seen) for e in received) == [
+        ("a", "6"), ("b", "7"), ("c", "8")]
+
+
+@pytest.mark.asyncio
+async def test_async_listener_flushes_held_touches_at_end():
+    transport = ReplayTransport(touched_replay("abcabcabc"), speed=None)
+    received = []
+
+    async def handler(event):
+        received.append(event)
+
+    await AsyncBrokerClient("http://broker", transport=transport) \
+        .listen_events(handler, touch_window=10.0)
+    assert sorted(e.data.id for e in received) == ["a", "b", "c"]
+
+
+def test_sync_listener_expires_touches_on_quiet_stream():
+    transport = ReplayTransport(touched_replay("a", gap_ms=600), speed=1.0)
+    start = time.monotonic()
+    arrivals = []
+    BrokerClient("http://broker", transport=transport).listen_events(
+        lambda e: arrivals.append((e.data.id, time.monotonic() - start)),
+        touch_window=0.1)
+    assert [id for id, _ in arrivals] == ["a", "z"]
+    assert arrivals[0][1] < 0.4
+
+
+def bad_touch_replay(gap_ms):
+    # An undecodable Touched held next to a good one, then a late Created.
+    bad = '{"id": "x", "type": "Bogus", "created_at": "", "last_seen": "",' \
+        ' "asset": {}}'
+    return [RecordedEvent(0, "EntityTouched", "", bad.encode())] \
+        + touched_replay("a", gap_ms)
+
+
+@pytest.mark.parametrize("gap_ms", [0, 300])
+def test_sync_listener_raises_undecodable_touch(gap_ms):
+    transport = ReplayTransport(bad_touch_replay(gap_ms), speed=1.0)
+    received = []
+    with pytest.raises(ValueError):
+        BrokerClient("http://broker", transport=transport).listen_events(
+            received.append, touch_window=0.05)
+    assert [e.data.id for e in received][:1] == ["a"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("gap_ms", [0, 300])
+async def test_async_listener_raises_undecodable_touch(gap_ms):
+    transport = ReplayTransport(bad_touch_replay(gap_ms), speed=1.0)
+    received = []
+
+    async def handler(event):
+        received.append(event)
+
+    with pytest.raises(ValueError):
+        await AsyncBrokerClient("http://broker", transport=transport) \
+            .listen_events(handler, touch_window=0.05)
+    assert [e.data.id for e in received][:1] == ["a"]